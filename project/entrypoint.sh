@@ -6,7 +6,7 @@ do
 done
 
 
-until python manage.py migrate
+until python manage.py migrate && python manage.py sync_occurrences && python manage.py rebuild_stats && python manage.py rebuild_search_index
 do
     echo "Waiting for db to be ready..."
     sleep 2
@@ -15,7 +15,16 @@ done
 
 # Allow platform to specify port and workers
 PORT="${PORT:-8000}"
-WORKERS="${WORKERS:-2}"
 
+# ASGI=1 serves the async views natively with uvicorn instead of gunicorn/WSGI
+if [ "${ASGI:-0}" = "1" ]; then
+    # Live updates with the default in-process events backend only reach clients
+    # of the worker that published them, so default to a single worker
+    export WORKERS="${WORKERS:-1}"
+    echo "Starting uvicorn on :$PORT with $WORKERS workers"
+    exec uvicorn project.asgi:application --host 0.0.0.0 --port "${PORT}" --workers "${WORKERS}"
+fi
+
+export WORKERS="${WORKERS:-2}"
 echo "Starting gunicorn on :$PORT with $WORKERS workers"
 gunicorn --bind ":${PORT}" --workers "${WORKERS}" project.wsgi
@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 import os
+import tempfile
+import warnings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -48,20 +50,30 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its totals cover the whole middleware stack
+    'yearwheel.middleware.ServerTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    # Serves STATIC_ROOT: hashed files with far-future caching, .br/.gz when accepted.
+    # WhiteNoise in an async-capable wrapper, so ASGI requests stay on the event loop
+    'yearwheel.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    # Sets request.htmx for views that answer HTMX navigation with a partial
+    'django_htmx.middleware.HtmxMiddleware',
 ]
 
 ROOT_URLCONF = 'project.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates with render timing for the Server-Timing header; the
+        # explicit NAME keeps template_partials' automatic loader setup working
+        'BACKEND': 'yearwheel.timing.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / "templates"],
         'OPTIONS': {
             'context_processors': [
@@ -69,6 +81,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'yearwheel.context_processors.live_updates',
             ],
         },
     },
@@ -96,6 +109,94 @@ else:
         }
     }
 
+# Opt-in tuning for serving from SQLite (SQLITE_PRODUCTION=1). WAL lets readers
+# run alongside the single writer, synchronous=NORMAL is durable enough in WAL
+# mode, and busy_timeout makes writers queue instead of failing with "database
+# is locked". Transactions start with BEGIN IMMEDIATE so a read-then-write
+# transaction (get_or_create, stats.record_marks) takes the write lock up front
+# rather than failing on upgrade. Under WSGI connections persist across requests
+# so the pragmas run once per worker; under ASGI (entrypoint ASGI=1) the ORM runs
+# on sync_to_async threads, where persistent connections would pile up per thread.
+YEARWHEEL_SQLITE_PRODUCTION_OPTIONS = {
+    'init_command': (
+        'PRAGMA journal_mode=WAL;'
+        'PRAGMA synchronous=NORMAL;'
+        'PRAGMA busy_timeout=5000;'
+        'PRAGMA temp_store=MEMORY;'
+        'PRAGMA mmap_size=134217728;'
+    ),
+    'transaction_mode': 'IMMEDIATE',
+}
+if not _db_url and os.getenv('SQLITE_PRODUCTION', 'False').lower() in ('1', 'true', 'yes'):
+    DATABASES['default'].update(
+        OPTIONS=YEARWHEEL_SQLITE_PRODUCTION_OPTIONS,
+        CONN_MAX_AGE=0 if os.getenv('ASGI', '0').lower() in ('1', 'true', 'yes') else 600,
+        CONN_HEALTH_CHECKS=True,
+    )
+
+
+# Server worker processes. entrypoint.sh exports WORKERS and starts that many
+# gunicorn/uvicorn workers; per-process state (local memory cache, live update
+# subscribers) is only correct with one.
+YEARWHEEL_WORKERS = int(os.getenv('WORKERS', '1'))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# The cached calendar grids are invalidated by whichever worker handles a write,
+# so several workers must share one cache: a file-based cache in CACHE_DIR, by
+# default under the temp dir whenever WORKERS > 1. Local memory (per process)
+# only for a single worker.
+_cache_dir = os.getenv('CACHE_DIR')
+if not _cache_dir and YEARWHEEL_WORKERS > 1:
+    _cache_dir = os.path.join(tempfile.gettempdir(), 'yearwheel-cache')
+if _cache_dir:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': _cache_dir,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'yearwheel',
+        }
+    }
+
+
+# Per-request timing: the Server-Timing header is always sent; set
+# TIMING_LOG=1 to also log one JSON line per request.
+YEARWHEEL_TIMING_LOG = os.getenv('TIMING_LOG', 'False').lower() in ('1', 'true', 'yes')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'yearwheel.timing': {'handlers': ['console'], 'level': 'INFO', 'propagate': False},
+    },
+}
+
+
+# Live updates over server-sent events. The stream holds a connection open per
+# page, so it is only enabled when serving ASGI (entrypoint ASGI=1). The default
+# in-process backend reaches clients of the same worker only, so with several
+# workers it would silently miss most events; live updates stay off then unless
+# EVENTS_BACKEND names a shared backend (the entrypoint runs one ASGI worker by default).
+YEARWHEEL_LIVE_UPDATES = os.getenv('LIVE_UPDATES', os.getenv('ASGI', '0')).lower() in ('1', 'true', 'yes')
+YEARWHEEL_EVENTS_BACKEND = os.getenv('EVENTS_BACKEND', 'yearwheel.events.InProcessBackend')
+if YEARWHEEL_LIVE_UPDATES and YEARWHEEL_WORKERS > 1 and YEARWHEEL_EVENTS_BACKEND == 'yearwheel.events.InProcessBackend':
+    warnings.warn(
+        f'Live updates disabled: the in-process events backend cannot reach clients of '
+        f'{YEARWHEEL_WORKERS} workers. Set WORKERS=1 or EVENTS_BACKEND to a shared backend.'
+    )
+    YEARWHEEL_LIVE_UPDATES = False
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -137,6 +238,12 @@ STATICFILES_DIRS = [_static_dir] if _static_dir.exists() else []
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATIC_URL = '/static/'
 
+# collectstatic writes content-hashed names plus precompressed .gz/.br variants
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'yearwheel.storage.StaticStorage'},
+}
+
 # Optional: allow configuring CSRF trusted origins from env (comma separated)
 _csrf = os.getenv('CSRF_TRUSTED_ORIGINS')
 if _csrf:
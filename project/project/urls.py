@@ -16,15 +16,27 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path
-from yearwheel import views
+from yearwheel import api, views
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', views.index, name='index'),
     path('tasks/', views.month_list, name='month_list'),
+    path('year/<int:year>/', views.year_overview, name='year_overview'),
+    path('search/', views.search_view, name='search'),
+    path('agenda/', views.agenda_view, name='agenda'),
+    path('stats/<int:year>/', views.stats_page, name='stats'),
+    path('feed.ics', views.ical_feed, name='ical_feed'),
+    path('events/', views.events_stream, name='events'),
+    path('api/tasks/', api.tasks, name='api_tasks'),
+    path('api/occurrences/', api.occurrences, name='api_occurrences'),
+    path('export/<str:kind>.<str:fmt>', views.export_data, name='export_data'),
+    path('import/', views.import_data, name='import_data'),
     path('task/new/', views.task_create, name='task_create'),
     path('task/<int:pk>/edit/', views.task_edit, name='task_edit'),
+    path('task/<int:pk>/details/', views.task_details, name='task_details'),
     path('task/<int:pk>/delete/', views.task_delete, name='task_delete'),
     path('task/<int:task_id>/toggle-done/', views.task_toggle_done, name='task_toggle_done'),
+    path('tasks/toggle-done/', views.task_bulk_toggle_done, name='task_bulk_toggle_done'),
     path('<str:season>/', views.season_list, name='season'),
 ]
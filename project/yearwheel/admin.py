@@ -1,14 +1,71 @@
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection
+from django.utils.functional import cached_property
+
 from .models import Task, TaskDone
 
+# Below this many rows an exact COUNT(*) is cheap and the estimate not worth its error
+EXACT_COUNT_BELOW = 10_000
+
+
+def estimated_row_count(model) -> int | None:
+    """Row count of the model's table from the planner statistics, or None if there are none."""
+    table = model._meta.db_table
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+            elif connection.vendor == "sqlite":
+                # Filled by ANALYZE (or PRAGMA optimize); the first number is the row count
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    count = int(str(row[0]).split()[0])
+    return count if count >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Uses the table statistics instead of COUNT(*) for unfiltered changelists of
+    large tables; filtered lists and small tables still count exactly.
+    """
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            estimate = estimated_row_count(self.object_list.model)
+            if estimate is not None and estimate >= EXACT_COUNT_BELOW:
+                return estimate
+        return super().count
+
+
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ("name", "recurrence", "month", "day", "week_rank", "weekday", "updated_at")
     list_filter = ("recurrence", "month", "week_rank", "weekday")
-    search_fields = ("name", "notes")
+    # Prefix match on the name, served by the task_name_prefix index (migration 0011)
+    search_fields = ("^name",)
+    ordering = ("season", "month", "day", "name")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
 @admin.register(TaskDone)
 class TaskDoneAdmin(admin.ModelAdmin):
     list_display = ("task", "year", "month", "completed_at")
     list_filter = ("year", "month")
-    search_fields = ("task__name",)
+    list_select_related = ("task",)
+    # Finds the tasks through task_name_prefix, then their marks by task_id
+    search_fields = ("^task__name",)
+    date_hierarchy = "completed_at"
+    ordering = ("-completed_at",)
+    # A select with every task would load the whole table into the change form
+    raw_id_fields = ("task",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
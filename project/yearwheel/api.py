@@ -0,0 +1,139 @@
+"""
+Read-only JSON endpoints for dashboards and widgets.
+
+Both endpoints page through live tasks by id (keyset pagination: `cursor` is the
+last task id of the previous page) and accept `fields=` to select which keys
+are serialized.
+"""
+from datetime import MAXYEAR, MINYEAR, date
+
+from django.http import HttpRequest, JsonResponse
+from django.views.decorators.http import require_GET
+
+from . import timing
+from .models import Task, TaskDone
+from .occurrences import year_occurrences
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+MAX_RANGE_MONTHS = 36
+
+TASK_FIELDS = ("id", "name", "notes", "month", "day", "weekday", "week_rank", "recurrence", "season", "updated_at")
+OCCURRENCE_FIELDS = ("task", "name", "date", "done")
+
+
+class ApiError(Exception):
+    pass
+
+
+def _error(message: str) -> JsonResponse:
+    return JsonResponse({"error": message}, status=400)
+
+
+def _fields(request: HttpRequest, allowed: tuple[str, ...]) -> list[str]:
+    raw = request.GET.get("fields")
+    if not raw:
+        return list(allowed)
+    fields = [f.strip() for f in raw.split(",") if f.strip()]
+    unknown = sorted(set(fields) - set(allowed))
+    if unknown:
+        raise ApiError(f"Unknown fields: {', '.join(unknown)}")
+    return fields
+
+
+def _page(request: HttpRequest) -> tuple[int, int]:
+    try:
+        cursor = int(request.GET.get("cursor") or 0)
+        limit = int(request.GET.get("limit") or DEFAULT_LIMIT)
+    except ValueError:
+        raise ApiError("cursor and limit must be integers")
+    return cursor, min(max(limit, 1), MAX_LIMIT)
+
+
+def _next_url(request: HttpRequest, ids: list[int], limit: int) -> str | None:
+    if len(ids) <= limit:
+        return None
+    query = request.GET.copy()
+    query["cursor"] = ids[limit - 1]
+    return f"{request.path}?{query.urlencode()}"
+
+
+def _parse_month(value: str | None, name: str) -> tuple[int, int]:
+    try:
+        year, month = (int(part) for part in (value or "").split("-"))
+    except ValueError:
+        raise ApiError(f"{name} must be given as YYYY-MM")
+    if not MINYEAR <= year <= MAXYEAR:
+        raise ApiError(f"{name} has an invalid year")
+    if not 1 <= month <= 12:
+        raise ApiError(f"{name} has an invalid month")
+    return year, month
+
+
+@require_GET
+def tasks(request: HttpRequest) -> JsonResponse:
+    try:
+        fields = _fields(request, TASK_FIELDS)
+        cursor, limit = _page(request)
+    except ApiError as exc:
+        return _error(str(exc))
+
+    # Fetch one extra row to know whether another page exists
+    rows = list(
+        Task.objects.filter(is_deleted=False, id__gt=cursor)
+        .order_by("id")
+        .values("id", *(f for f in fields if f != "id"))[: limit + 1]
+    )
+    next_url = _next_url(request, [row["id"] for row in rows], limit)
+    results = [{f: row[f] for f in fields} for row in rows[:limit]]
+    return JsonResponse({"results": results, "next": next_url})
+
+
+@require_GET
+def occurrences(request: HttpRequest) -> JsonResponse:
+    """
+    Occurrences of a page of tasks between `from` and `to` (inclusive months),
+    ordered by task id, then date. Resolved in bulk: one query for the tasks,
+    one for their completions, and one vectorized pass per year.
+    """
+    try:
+        fields = _fields(request, OCCURRENCE_FIELDS)
+        cursor, limit = _page(request)
+        start = _parse_month(request.GET.get("from"), "from")
+        end = _parse_month(request.GET.get("to"), "to")
+    except ApiError as exc:
+        return _error(str(exc))
+    span = (end[0] - start[0]) * 12 + end[1] - start[1] + 1
+    if not 1 <= span <= MAX_RANGE_MONTHS:
+        return _error(f"to must not be before from, and the range is limited to {MAX_RANGE_MONTHS} months")
+
+    page = Task.objects.filter(is_deleted=False, id__gt=cursor).order_by("id")[: limit + 1].rules()
+    next_url = _next_url(request, [rule.id for rule in page], limit)
+    page = page[:limit]
+    names = {rule.id: rule.name for rule in page}
+
+    done = set()
+    if "done" in fields:
+        done = set(
+            TaskDone.objects.filter(task__in=[rule.id for rule in page], year__gte=start[0], year__lte=end[0])
+            .values_list("task_id", "year", "month")
+        )
+
+    found = []
+    with timing.span(timing.OCCURRENCES):
+        for year in range(start[0], end[0] + 1):
+            for task_id, month, day in year_occurrences(page, year):
+                if start <= (year, month) <= end:
+                    found.append((task_id, year, month, day))
+        found.sort()
+
+    results = []
+    for task_id, year, month, day in found:
+        row = {
+            "task": task_id,
+            "name": names[task_id],
+            "date": date(year, month, day).isoformat(),
+            "done": (task_id, year, month) in done,
+        }
+        results.append({f: row[f] for f in fields})
+    return JsonResponse({"results": results, "next": next_url})
@@ -4,3 +4,17 @@ from django.apps import AppConfig
 class YearwheelConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'yearwheel'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_delete, post_save
+        from . import checks, signals  # noqa: F401 - checks registers on import
+        from .timing import install_query_timer
+
+        connection_created.connect(install_query_timer, dispatch_uid="yearwheel.timing")
+        task = self.get_model("Task")
+        post_save.connect(signals.task_saved, sender=task, dispatch_uid="yearwheel.task_saved")
+        post_delete.connect(signals.task_deleted, sender=task, dispatch_uid="yearwheel.task_deleted")
+        done = self.get_model("TaskDone")
+        post_save.connect(signals.done_saved, sender=done, dispatch_uid="yearwheel.done_saved")
+        post_delete.connect(signals.done_deleted, sender=done, dispatch_uid="yearwheel.done_deleted")
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+from .management.commands.build_css import OUTPUT
+
+
+@register()
+def stylesheet_built(app_configs, **kwargs):
+    """The compiled stylesheet only exists after `build_css` (or the Docker build) has run."""
+    if (settings.BASE_DIR / OUTPUT).exists() or (settings.STATIC_ROOT / "css/app.css").exists():
+        return []
+    return [
+        Warning(
+            f"{OUTPUT} has not been built, so pages are served unstyled.",
+            hint="Run `python manage.py build_css` (see its --help for getting the Tailwind CLI).",
+            id="yearwheel.W001",
+        )
+    ]
@@ -0,0 +1,5 @@
+from django.conf import settings
+
+
+def live_updates(request):
+    return {"live_updates": settings.YEARWHEEL_LIVE_UPDATES}
@@ -0,0 +1,95 @@
+"""
+Live update events pushed to open pages over server-sent events.
+
+Publishers (toggle views, task edits) call `publish_done` / `publish_task`; the
+`/events/` stream forwards every event to its subscribers. The pub/sub backend
+is pluggable through YEARWHEEL_EVENTS_BACKEND. The default InProcessBackend only
+reaches subscribers in the same process, so run a single ASGI worker or plug
+in a shared backend (e.g. Redis) with the same `subscribe`/`publish` interface.
+"""
+import asyncio
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+# Events a slow subscriber may lag behind before new ones are dropped for it
+QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, backend: "InProcessBackend"):
+        self.backend = backend
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    async def next(self, timeout: float) -> tuple[str, str] | None:
+        """Next (event, data) pair, or None when nothing arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def offer(self, message: tuple[str, str]) -> None:
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            pass
+
+    def close(self) -> None:
+        self.backend.unsubscribe(self)
+
+
+class InProcessBackend:
+    """Fan-out to subscribers of this process; publish is safe from any thread."""
+
+    def __init__(self):
+        self._subscriptions: set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        subscription = Subscription(self)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event: str, data: str) -> None:
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, (event, data))
+            except RuntimeError:
+                # The subscriber's loop has shut down
+                self.unsubscribe(subscription)
+
+
+@lru_cache(maxsize=1)
+def get_backend():
+    return import_string(settings.YEARWHEEL_EVENTS_BACKEND)()
+
+
+def format_event(event: str, data: str) -> str:
+    lines = "".join(f"data: {line}\n" for line in data.splitlines() or [""])
+    return f"event: {event}\n{lines}\n"
+
+
+def publish_done(task, year: int, month: int, is_done: bool) -> None:
+    """Pushes the task's checkbox for year+month as an out-of-band fragment."""
+    html = render_to_string(
+        "partials/task_checkbox.html",
+        {"task": task, "year": year, "month": month, "is_done": is_done, "oob": True},
+    )
+    get_backend().publish("done", html)
+
+
+def publish_task(task_id: int) -> None:
+    """Tells pages showing the task that its schedule or text changed."""
+    get_backend().publish("task", str(task_id))
@@ -0,0 +1,72 @@
+"""
+Cache of the rendered month calendar grid (the `calendar-body` partial of index.html).
+
+Entries live in Django's cache framework, keyed by (year, month). Which months a
+task falls in does not depend on the year, so task edits invalidate by bumping a
+per-month-of-year version that is part of every key for that month. TaskDone
+writes (yearwheel.signals) and the toggle views bump the version of the month
+they affect.
+"""
+import time
+
+from django.core.cache import cache
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+CALENDAR_TIMEOUT = 60 * 60 * 24
+
+
+def _version_key(month: int) -> str:
+    return f"yearwheel:calendar-version:{month}"
+
+
+def today_day(year: int, month: int) -> int | None:
+    """Day to highlight in the grid: today's day when showing the current month."""
+    today = timezone.localdate()
+    return today.day if (today.year, today.month) == (year, month) else None
+
+
+def _new_version() -> int:
+    # Unique rather than 1, so a version key lost to eviction or culling never
+    # comes back as a version some still-cached grid was stored under
+    return time.time_ns()
+
+
+def calendar_key(year: int, month: int) -> str:
+    """
+    Current key for the month's grid. Resolve it before loading data so a render
+    that races with an invalidation is stored under the superseded key.
+    """
+    version = cache.get_or_set(_version_key(month), _new_version, timeout=None)
+    return f"yearwheel:calendar:{year}-{month}:v{version}:{today_day(year, month) or 0}"
+
+
+async def acalendar_key(year: int, month: int) -> str:
+    version = await cache.aget_or_set(_version_key(month), _new_version, timeout=None)
+    return f"yearwheel:calendar:{year}-{month}:v{version}:{today_day(year, month) or 0}"
+
+
+async def aget_calendar(key: str) -> str | None:
+    body = await cache.aget(key)
+    return mark_safe(body) if body is not None else None
+
+
+async def aset_calendar(key: str, body: str) -> None:
+    await cache.aset(key, str(body), CALENDAR_TIMEOUT)
+
+
+def invalidate_months(months) -> None:
+    """Drops every cached year of the given months of the year."""
+    for month in months:
+        try:
+            cache.incr(_version_key(month))
+        except ValueError:
+            # The version was never stored or has been evicted: start a fresh one
+            cache.set(_version_key(month), _new_version(), timeout=None)
+
+
+def task_months(task) -> set[int]:
+    """Months of the year where the task can show up in the calendar grid."""
+    if not (task.uses_exact_date() or task.uses_weekday_rule()):
+        return set()
+    return {month for month in range(1, 13) if task.occurs_in_month(0, month)}
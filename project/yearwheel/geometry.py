@@ -0,0 +1,27 @@
+"""
+Per-process cache of month layouts.
+
+Calendar math for a month depends only on (year, month), so it is computed once
+and shared by Task.occurrence_day_in, the occurrence engine and the views.
+"""
+import calendar
+from functools import lru_cache
+from typing import NamedTuple
+
+
+class MonthGeometry(NamedTuple):
+    # Weeks of day numbers, Monday first, 0 = out-of-month (Calendar.monthdayscalendar)
+    weeks: tuple[tuple[int, ...], ...]
+    last_day: int
+    # Days of the month falling on each weekday, indexed 0=Mon..6=Sun
+    weekday_days: tuple[tuple[int, ...], ...]
+
+
+@lru_cache(maxsize=240)
+def month_geometry(year: int, month: int) -> MonthGeometry:
+    cal = calendar.Calendar(firstweekday=0)  # Monday first
+    weeks = tuple(tuple(week) for week in cal.monthdayscalendar(year, month))
+    weekday_days = tuple(
+        tuple(week[wd] for week in weeks if week[wd]) for wd in range(7)
+    )
+    return MonthGeometry(weeks, calendar.monthrange(year, month)[1], weekday_days)
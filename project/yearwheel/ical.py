@@ -0,0 +1,107 @@
+"""
+iCalendar (RFC 5545) export of tasks as all-day recurring VEVENTs.
+
+Every schedule the model supports maps to a native RRULE: BYMONTHDAY for exact
+days, BYDAY=2TU / -1FR for ordinal weekdays, and FREQ=MONTHLY with INTERVAL=3/6
+for quarterly/semiannual. Dates that do not exist in a month (31st of June) are
+skipped by RRULE expansion just as Task.occurrence_day_in skips them. Tasks whose
+schedule cannot be expressed as a rule are expanded to RDATEs over the
+TaskOccurrence horizon; season-only tasks have no day and are left out.
+"""
+from datetime import date, timezone
+
+from .models import Task, TaskOccurrence
+
+PRODID = "-//yearwheel//Årshjulet//NO"
+WEEKDAY_CODES = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+_INTERVALS = {
+    Task.Recurrence.MONTHLY: 1,
+    Task.Recurrence.QUARTERLY: 3,
+    Task.Recurrence.SEMIANNUAL: 6,
+}
+
+
+def escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Folds a content line to 75 octets per physical line, as RFC 5545 requires."""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        # Never split inside a UTF-8 sequence
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode())
+        start, limit = end, 74  # continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def rrule(task: Task) -> str | None:
+    if task.uses_exact_date() and 1 <= task.day <= 31:
+        by_day = f"BYMONTHDAY={task.day}"
+    elif task.uses_weekday_rule() and 0 <= task.weekday <= 6:
+        rank = "-1" if task.week_rank == Task.WeekRank.LAST else task.week_rank
+        by_day = f"BYDAY={rank}{WEEKDAY_CODES[task.weekday]}"
+    else:
+        return None
+    if task.recurrence == Task.Recurrence.YEARLY:
+        return f"FREQ=YEARLY;BYMONTH={task.month};{by_day}" if task.month else None
+    interval = _INTERVALS[task.recurrence]
+    return f"FREQ=MONTHLY;INTERVAL={interval};{by_day}" if interval > 1 else f"FREQ=MONTHLY;{by_day}"
+
+
+def first_occurrence(task: Task, year: int) -> date | None:
+    # Rules repeat at least yearly; only Feb 29 needs to look further (leap years, incl. 2100)
+    for index in range(12 * 8):
+        y, m = year + index // 12, index % 12 + 1
+        if day := task.occurrence_day_in(y, m):
+            return date(y, m, day)
+    return None
+
+
+def event_lines(task: Task) -> list[str]:
+    dtstart = first_occurrence(task, task.created_at.year)
+    if dtstart is None:
+        return []
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:task-{task.id}@yearwheel",
+        f"DTSTAMP:{task.updated_at.astimezone(timezone.utc):%Y%m%dT%H%M%SZ}",
+        f"DTSTART;VALUE=DATE:{dtstart:%Y%m%d}",
+        f"SUMMARY:{escape_text(task.name)}",
+    ]
+    if task.notes:
+        lines.append(f"DESCRIPTION:{escape_text(task.notes)}")
+    if rule := rrule(task):
+        lines.append(f"RRULE:{rule}")
+    else:
+        dates = [
+            date(year, month, day)
+            for year in TaskOccurrence.horizon()
+            for month in range(1, 13)
+            if (day := task.occurrence_day_in(year, month)) and date(year, month, day) > dtstart
+        ]
+        if dates:
+            lines.append("RDATE;VALUE=DATE:" + ",".join(f"{d:%Y%m%d}" for d in dates))
+    lines.append("END:VEVENT")
+    return lines
+
+
+def calendar_stream(tasks):
+    """Yields the feed as folded content lines; `tasks` is consumed lazily."""
+    for line in ("BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{PRODID}", "CALSCALE:GREGORIAN", "X-WR-CALNAME:Årshjulet"):
+        yield fold(line)
+    for task in tasks:
+        yield "".join(fold(line) for line in event_lines(task))
+    yield fold("END:VCALENDAR")
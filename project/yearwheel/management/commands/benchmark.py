@@ -0,0 +1,119 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.utils import timezone
+
+from yearwheel.models import Task
+from yearwheel.synthetic import load_synthetic, rolled_back
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(fn, repeat: int) -> dict:
+    """Runs `fn` `repeat` times; reports latency percentiles, queries per run and peak memory."""
+    timings = []
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        # execute_wrapper survives the queries_log reset done on each test client request
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(count_queries):
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            timings.append((time.perf_counter() - start) * 1000)
+    # Memory is traced in a separate run so tracing overhead stays out of the timings
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "runs": repeat,
+        "p50_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "queries": len(queries) // repeat,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks occurrence resolution and the calendar views on synthetic task sets "
+        "(loaded in a rolled-back transaction) and writes the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000", help="Comma separated task counts")
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--output", default="benchmark.json")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size]
+        year = timezone.localdate().year
+        results = {
+            "commit": _git_commit(),
+            "created": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "database": connection.vendor,
+            "sizes": {},
+        }
+        for size in sizes:
+            self.stdout.write(f"Loading {size} tasks...")
+            with rolled_back():
+                load_synthetic(size, year)
+                results["sizes"][str(size)] = self._run(size, year, options["repeat"])
+
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(results, fh, indent=2)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def _run(self, size, year, repeat):
+        live = Task.objects.filter(is_deleted=False)
+        tasks = live.rules()
+        client = Client()
+
+        def month_scan(method):
+            return lambda: [getattr(t, method)(year, m) for t in tasks for m in range(1, 13)]
+
+        def cold(url):
+            def request():
+                cache.clear()
+                client.get(url)
+            return request
+
+        cases = {
+            # Construction cost and footprint of ORM instances vs. slotted rules
+            "load_instances": lambda: list(live.all()),
+            "load_rules": lambda: live.rules(),
+            "occurrence_day_in": month_scan("occurrence_day_in"),
+            "occurs_in_month": month_scan("occurs_in_month"),
+            "index_cold": cold(f"/?year={year}&month=3"),
+            "index_warm": lambda: client.get(f"/?year={year}&month=3"),
+            "month_list": lambda: client.get("/tasks/?month=3"),
+            "season_list": lambda: client.get("/spring/"),
+        }
+        report = {}
+        for name, fn in cases.items():
+            # Per-object loops are slow at large sizes; a few runs are enough there
+            runs = max(3, repeat // 5) if name.startswith("occur") else repeat
+            report[name] = measure(fn, runs)
+            self.stdout.write(f"  {size:>7} {name:<18} {report[name]}")
+        return report
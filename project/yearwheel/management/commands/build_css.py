@@ -0,0 +1,35 @@
+import os
+import shutil
+import subprocess
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SOURCE = "assets/app.css"
+OUTPUT = "static/css/app.css"
+DOWNLOAD = (
+    "Download the binary for your platform from https://github.com/tailwindlabs/tailwindcss/releases "
+    "(the version pinned in the Dockerfile) and put it on PATH as `tailwindcss` or point TAILWIND_CLI at it."
+)
+
+
+class Command(BaseCommand):
+    help = f"Compiles {SOURCE} into {OUTPUT} with the Tailwind standalone CLI, as the Docker build does. {DOWNLOAD}"
+    # The stylesheet check would only warn about the file this command writes
+    requires_system_checks = []
+
+    def add_arguments(self, parser):
+        parser.add_argument("--watch", action="store_true", help="Rebuild whenever a template or the source changes.")
+
+    def handle(self, *args, watch=False, **options):
+        cli = os.getenv("TAILWIND_CLI", "tailwindcss")
+        if shutil.which(cli) is None:
+            raise CommandError(f"Tailwind CLI {cli!r} not found. {DOWNLOAD}")
+        command = [cli, "-i", SOURCE, "-o", OUTPUT, "--watch" if watch else "--minify"]
+        try:
+            subprocess.run(command, cwd=settings.BASE_DIR, check=True)
+        except subprocess.CalledProcessError as exc:
+            raise CommandError(f"Tailwind CLI failed with exit code {exc.returncode}")
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(self.style.SUCCESS(f"Wrote {OUTPUT}"))
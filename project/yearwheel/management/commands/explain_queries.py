@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count, Exists, Max, OuterRef
+from django.utils import timezone
+
+from yearwheel.models import Task, TaskDone, TaskOccurrence
+from yearwheel.synthetic import load_synthetic, rolled_back
+
+
+class Command(BaseCommand):
+    help = (
+        "Loads a synthetic task set inside a transaction that is rolled back, and prints "
+        "the query plans of the view query shapes with and without the yearwheel indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=100_000)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.stdout.write(f"Loading {options['tasks']} tasks on {connection.vendor}...")
+            load_synthetic(options["tasks"], timezone.localdate().year)
+            self._analyze()
+            self._report("with indexes")
+            self._drop_indexes()
+            self._report("without indexes")
+
+    def _analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+    def _drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in (Task, TaskDone):
+                for index in model._meta.indexes:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+        self._analyze()
+
+    def _shapes(self):
+        year, month = timezone.localdate().year, 3
+        done = TaskDone.objects.filter(year=year, month=month)
+        return {
+            "season_list": Task.objects.filter(season=Task.Season.SPRING, is_deleted=False).order_by("month", "day", "name"),
+            "occurring_in": Task.objects.filter(is_deleted=False)
+            .occurring_in(year, month)
+            .annotate(is_done=Exists(done.filter(task=OuterRef("pk")))),
+            "calendar_month": TaskOccurrence.objects.filter(year=year, month=month, task__is_deleted=False)
+            .select_related("task")
+            .annotate(is_done=Exists(done.filter(task=OuterRef("task_id"))))
+            .order_by("day", "task__name"),
+            "etag_tasks": Task.objects.values(updated=Max("updated_at"), count=Count("id")),
+            "etag_done": done.values(completed=Max("completed_at"), count=Count("id")),
+        }
+
+    def _report(self, label):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== {label} =="))
+        for name, queryset in self._shapes().items():
+            self.stdout.write(self.style.SUCCESS(name))
+            self.stdout.write(queryset.explain())
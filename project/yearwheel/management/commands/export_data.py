@@ -0,0 +1,26 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from yearwheel import transfer
+
+
+class Command(BaseCommand):
+    help = "Streams live tasks or their done marks as CSV or JSON lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=transfer.KINDS)
+        parser.add_argument("--format", choices=transfer.FORMATS, default="jsonl")
+        parser.add_argument("--output", default="-", help="File to write, or - for stdout")
+
+    def handle(self, *args, **options):
+        try:
+            lines = transfer.export_stream(options["kind"], options["format"])
+            if options["output"] == "-":
+                sys.stdout.writelines(lines)
+                return
+            with open(options["output"], "w", encoding="utf-8", newline="") as fh:
+                fh.writelines(lines)
+        except (OSError, transfer.TransferError) as exc:
+            raise CommandError(exc)
+        self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
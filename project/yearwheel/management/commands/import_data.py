@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from yearwheel import transfer
+
+
+class Command(BaseCommand):
+    help = "Imports tasks or done marks from a CSV or JSON lines file, as written by export_data."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", choices=transfer.KINDS)
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=transfer.FORMATS, help="Defaults to the file extension")
+
+    def handle(self, *args, **options):
+        fmt = options["format"] or transfer.format_for(options["path"])
+        try:
+            with open(options["path"], encoding="utf-8-sig", newline="") as fh:
+                report = transfer.import_stream(options["kind"], fmt, fh)
+        except (OSError, transfer.TransferError) as exc:
+            raise CommandError(exc)
+        for line, message in report.errors:
+            self.stderr.write(f"line {line}: {message}")
+        summary = f"{report.created} created, {report.updated} updated, {report.unchanged} unchanged, {len(report.errors)} errors"
+        self.stdout.write(self.style.WARNING(summary) if report.errors else self.style.SUCCESS(summary))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from yearwheel import search
+
+
+class Command(BaseCommand):
+    help = "Refills the SQLite full-text index of task names and notes (PostgreSQL keeps its own)."
+
+    def handle(self, *args, **options):
+        count = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {count} tasks"))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from yearwheel import stats
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the TaskYearStats completion summary from the live tasks and their done marks."
+
+    def handle(self, *args, **options):
+        count = stats.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} task/year summaries"))
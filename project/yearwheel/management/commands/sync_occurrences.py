@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from yearwheel.models import OccurrenceRule, Task, TaskOccurrence
+
+BATCH_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the materialized TaskOccurrence rows for the rolling horizon around the current year."
+
+    def handle(self, *args, **options):
+        years = TaskOccurrence.horizon()
+        rows = Task.objects.filter(is_deleted=False).values_list(*OccurrenceRule.FIELDS)
+        with transaction.atomic():
+            TaskOccurrence.objects.all().delete()
+            batch = []
+            for row in rows.iterator(chunk_size=BATCH_SIZE):
+                batch.append(OccurrenceRule(*row))
+                if len(batch) >= BATCH_SIZE:
+                    TaskOccurrence.insert_for(batch, years)
+                    batch = []
+            TaskOccurrence.insert_for(batch, years)
+        self.stdout.write(
+            self.style.SUCCESS(f"Synced occurrences for {years.start}-{years.stop - 1}")
+        )
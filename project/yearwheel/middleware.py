@@ -0,0 +1,122 @@
+import json
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.http import HttpResponse
+from whitenoise.middleware import WhiteNoiseMiddleware
+
+from . import timing
+
+logger = logging.getLogger("yearwheel.timing")
+
+
+class ServerTimingMiddleware:
+    """
+    Measures SQL queries and time spent in the database, occurrence resolution and
+    template rendering for each request, and reports them in a Server-Timing
+    header. With YEARWHEEL_TIMING_LOG enabled, each request also logs one JSON line.
+    Works in both sync and async stacks so async views are not forced onto a thread.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, began = timing.start(), time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            timing.stop()
+        return self._report(request, response, timings, began)
+
+    async def __acall__(self, request):
+        timings, began = timing.start(), time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            timing.stop()
+        return self._report(request, response, timings, began)
+
+    def _report(self, request, response, timings, began):
+        total = (time.perf_counter() - began) * 1000
+        db_ms, queries = timings.get(timing.DATABASE, (0.0, 0))
+        occ_ms, _ = timings.get(timing.OCCURRENCES, (0.0, 0))
+        tpl_ms, _ = timings.get(timing.TEMPLATES, (0.0, 0))
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={db_ms:.1f};desc="{queries} queries"',
+                f'occ;dur={occ_ms:.1f};desc="occurrences"',
+                f'tpl;dur={tpl_ms:.1f};desc="templates"',
+                f"total;dur={total:.1f}",
+            ]
+        )
+        if getattr(settings, "YEARWHEEL_TIMING_LOG", False):
+            logger.info(
+                json.dumps(
+                    {
+                        "method": request.method,
+                        "path": request.path,
+                        "status": response.status_code,
+                        "queries": queries,
+                        "db_ms": round(db_ms, 1),
+                        "occ_ms": round(occ_ms, 1),
+                        "tpl_ms": round(tpl_ms, 1),
+                        "total_ms": round(total, 1),
+                    }
+                )
+            )
+        return response
+
+
+class StaticFilesMiddleware(WhiteNoiseMiddleware):
+    """
+    WhiteNoise for both handler modes. WhiteNoiseMiddleware is sync-only, so
+    under ASGI it would push every request onto a thread and back; here only a
+    request that matches a static file leaves the event loop, to read the file.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, settings=settings):
+        super().__init__(get_response, settings)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            # Development only: the lookup itself touches the filesystem
+            static_file = await sync_to_async(self.find_file)(request.path_info)
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is None:
+            return await self.get_response(request)
+        return await sync_to_async(self.serve_buffered, thread_sensitive=False)(static_file, request)
+
+    @classmethod
+    def serve_buffered(cls, static_file, request) -> HttpResponse:
+        # Read the (small, precompressed) file here, so the ASGI handler does not
+        # have to drain a sync file iterator
+        streamed = cls.serve(static_file, request)
+        try:
+            response = HttpResponse(b"".join(streamed.streaming_content), status=streamed.status_code)
+        finally:
+            streamed.close()
+        del response["Content-Type"]
+        for key, value in streamed.items():
+            response[key] = value
+        return response
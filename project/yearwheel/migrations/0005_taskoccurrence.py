@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yearwheel', '0004_recurrence_weekday_and_taskdone_month'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='recurrence',
+            field=models.CharField(choices=[('yearly', 'Årlig'), ('semiannual', 'Halvårlig'), ('quarterly', 'Kvartalsvis'), ('monthly', 'Månedlig')], default='yearly', max_length=12),
+        ),
+        migrations.CreateModel(
+            name='TaskOccurrence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('day', models.PositiveSmallIntegerField()),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occurrences', to='yearwheel.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year', 'month', 'day'], name='occurrence_year_month_day')],
+                'constraints': [models.UniqueConstraint(fields=('task', 'year', 'month'), name='unique_task_occurrence_month')],
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yearwheel', '0005_taskoccurrence'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='task',
+            options={},
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('is_deleted', False)), fields=['season', 'month', 'day', 'name'], name='task_live_season_schedule'),
+        ),
+        migrations.AddIndex(
+            model_name='taskdone',
+            index=models.Index(fields=['year', 'month', 'completed_at'], name='taskdone_period_completed'),
+        ),
+    ]
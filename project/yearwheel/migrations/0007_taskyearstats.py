@@ -0,0 +1,30 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yearwheel', '0006_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskYearStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveIntegerField()),
+                ('expected_months', models.PositiveIntegerField(default=0)),
+                ('done_months', models.PositiveIntegerField(default=0)),
+                ('expected_count', models.PositiveSmallIntegerField(default=0)),
+                ('done_count', models.PositiveSmallIntegerField(default=0)),
+                ('task', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='year_stats', to='yearwheel.task')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['year'], name='taskyearstats_year')],
+                'constraints': [models.UniqueConstraint(fields=('task', 'year'), name='unique_task_year_stats')],
+            },
+        ),
+    ]
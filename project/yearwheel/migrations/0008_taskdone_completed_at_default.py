@@ -0,0 +1,19 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yearwheel', '0007_taskyearstats'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='taskdone',
+            name='completed_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
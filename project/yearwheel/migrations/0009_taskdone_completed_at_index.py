@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 07:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yearwheel', '0008_taskdone_completed_at_default'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='taskdone',
+            index=models.Index(fields=['completed_at'], name='taskdone_completed_at'),
+        ),
+    ]
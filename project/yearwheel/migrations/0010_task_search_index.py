@@ -0,0 +1,42 @@
+from django.db import migrations
+
+FTS_TABLE = "yearwheel_task_fts"
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')"
+)
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(name, notes, tokenize='unicode61 remove_diacritics 2')"
+        )
+        schema_editor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, notes) "
+            "SELECT id, name, notes FROM yearwheel_task WHERE NOT is_deleted"
+        )
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            f"CREATE INDEX task_search_vector ON yearwheel_task USING GIN (({PG_VECTOR})) WHERE NOT is_deleted"
+        )
+
+
+def drop_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS task_search_vector")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yearwheel', '0009_taskdone_completed_at_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+# The admin's "^name" search is name__istartswith. SQLite compiles that to a
+# case-insensitive LIKE 'term%', which only a NOCASE index can serve; PostgreSQL
+# compares UPPER(name::text) LIKE UPPER('term%'), served by a pattern_ops index
+# on that expression.
+
+
+def create_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute("CREATE INDEX task_name_prefix ON yearwheel_task (name COLLATE NOCASE)")
+    elif vendor == "postgresql":
+        schema_editor.execute(
+            'CREATE INDEX task_name_prefix ON yearwheel_task (UPPER("name"::text) text_pattern_ops)'
+        )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ("sqlite", "postgresql"):
+        schema_editor.execute("DROP INDEX IF EXISTS task_name_prefix")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('yearwheel', '0010_task_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,9 +1,176 @@
-from django.db import models
+from django.db import connection, models, transaction
+from django.db.models import Q
 from django.core.exceptions import ValidationError
+from django.utils import timezone
 import calendar
+from datetime import date
 
+from .geometry import month_geometry
 
-class Task(models.Model):
+
+def _cycle_months(anchor: int, step: int) -> list[int]:
+    # All months reachable from the anchor month in steps of `step` months
+    return sorted({((anchor - 1 + offset) % 12) + 1 for offset in range(0, 12, step)})
+
+
+class TaskQuerySet(models.QuerySet):
+    def occurring_in(self, year: int, month: int) -> "TaskQuerySet":
+        """
+        Narrows the queryset to tasks that can occur in the given year+month.
+
+        Mirrors the anchor-month rules of Task.occurs_in_month as SQL predicates and
+        drops rows that have no day-level schedule or an exact day past the month end.
+        The result is a candidate set: callers still resolve the exact day in Python
+        via Task.occurrence_day_in (weekday ranks like "5th" may not exist).
+        """
+        last_day = month_geometry(year, month).last_day
+        in_month = (
+            Q(recurrence=Task.Recurrence.MONTHLY)
+            | Q(recurrence=Task.Recurrence.QUARTERLY, month__in=_cycle_months(month, 3))
+            | Q(recurrence=Task.Recurrence.SEMIANNUAL, month__in=_cycle_months(month, 6))
+            | Q(recurrence=Task.Recurrence.YEARLY, month=month)
+        )
+        has_day = (
+            Q(day__gte=1, day__lte=last_day)
+            | (Q(weekday__isnull=False) & ~Q(week_rank=""))
+        )
+        return self.filter(in_month & has_day)
+
+    def rules(self) -> list["OccurrenceRule"]:
+        """The queryset's tasks as OccurrenceRule objects, loading only their columns."""
+        return [OccurrenceRule(*row) for row in self.values_list(*OccurrenceRule.FIELDS)]
+
+
+class TaskSchedule:
+    """
+    Schedule rules shared by Task and OccurrenceRule: everything here reads only
+    the schedule fields (month, day, weekday, week_rank, recurrence, season).
+    """
+
+    __slots__ = ()
+
+    # ---- Helpers for schedule kinds ----
+    def uses_exact_date(self) -> bool:
+        return bool(self.day) and (
+            self.month is not None or self.recurrence in {Task.Recurrence.MONTHLY, Task.Recurrence.QUARTERLY, Task.Recurrence.SEMIANNUAL}
+        )
+
+    def uses_weekday_rule(self) -> bool:
+        return (
+            self.weekday is not None
+            and bool(self.week_rank)
+            and (self.month is not None or self.recurrence in {Task.Recurrence.MONTHLY, Task.Recurrence.QUARTERLY, Task.Recurrence.SEMIANNUAL})
+        )
+
+    def human_when(self) -> str:
+        # Friendly representation of timing
+        if self.day:
+            if self.recurrence == Task.Recurrence.MONTHLY:
+                return f"Dag {self.day} hver måned"
+            if self.recurrence == Task.Recurrence.SEMIANNUAL and self.month:
+                return f"Dag {self.day} i måned {self.month} og {((self.month + 5 - 1) % 12) + 1} (halvårlig)"
+            if self.recurrence == Task.Recurrence.QUARTERLY and self.month:
+                return f"Dag {self.day} i {self.month}. måned hvert kvartal"
+            if self.month:
+                return f"{self.day:02d}.{self.month:02d} ({self.season_label()})"
+        if self.weekday is not None and self.week_rank:
+            weekday_names = ["Mandag", "Tirsdag", "Onsdag", "Torsdag", "Fredag", "Lørdag", "Søndag"]
+            rank_labels = {"1": "Første", "2": "Andre", "3": "Tredje", "4": "Fjerde", "last": "Siste"}
+            if self.recurrence == Task.Recurrence.MONTHLY:
+                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} hver måned"
+            if self.recurrence == Task.Recurrence.SEMIANNUAL and self.month:
+                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} i måned {self.month} og {((self.month + 5 - 1) % 12) + 1} (halvårlig)"
+            if self.recurrence == Task.Recurrence.QUARTERLY and self.month:
+                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} i måned {self.month} hvert kvartal"
+            if self.month:
+                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} i {calendar.month_name[self.month]}"
+        if self.season:
+            return self.season_label()
+        return ""
+
+    def _quarter_months(self) -> set[int]:
+        if not self.month:
+            return set()
+        return set(_cycle_months(self.month, 3))
+
+    def _semiannual_months(self) -> set[int]:
+        if not self.month:
+            return set()
+        return set(_cycle_months(self.month, 6))
+
+    def occurs_in_month(self, year: int, month: int) -> bool:
+        if self.recurrence == Task.Recurrence.MONTHLY:
+            return True
+        if self.recurrence == Task.Recurrence.QUARTERLY:
+            return month in self._quarter_months()
+        if self.recurrence == Task.Recurrence.SEMIANNUAL:
+            return month in self._semiannual_months()
+        # yearly
+        return self.month == month
+
+    def occurrence_day_in(self, year: int, month: int) -> int | None:
+        """
+        Returns the day-of-month (1..31) when this task occurs for the given year+month,
+        or None if it does not occur in that month. Works for both schedule types.
+        """
+        if not self.occurs_in_month(year, month):
+            return None
+        geometry = month_geometry(year, month)
+        if self.day:
+            # Exact day, but if month has fewer days (e.g., 30 vs 31), skip occurrence
+            return self.day if self.day <= geometry.last_day else None
+        if self.weekday is not None and self.week_rank:
+            days = geometry.weekday_days[self.weekday] if 0 <= self.weekday <= 6 else ()
+            if not days:
+                return None
+            if self.week_rank == Task.WeekRank.LAST:
+                return days[-1]
+            idx = int(self.week_rank) - 1
+            return days[idx] if idx < len(days) else None
+        return None
+
+    def occurrence_dates(self, start: date, end: date):
+        """Lazily yields the occurrence dates in [start, end] in order, month by month."""
+        year, month = start.year, start.month
+        while (year, month) <= (end.year, end.month):
+            day = self.occurrence_day_in(year, month)
+            if day and start <= (when := date(year, month, day)) <= end:
+                yield when
+            year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+    def season_label(self) -> str:
+        # get_season_display() for objects without model field machinery
+        return dict(Task.Season.choices).get(self.season, self.season)
+
+
+class OccurrenceRule(TaskSchedule):
+    """
+    Schedule of one task detached from the ORM: id, name and the schedule fields,
+    built from `values_list(*OccurrenceRule.FIELDS)` rows. Views resolve and
+    display occurrences on these instead of full Task instances.
+    """
+
+    FIELDS = ("id", "name", "month", "day", "weekday", "week_rank", "recurrence", "season")
+    __slots__ = FIELDS
+
+    def __init__(self, id, name, month, day, weekday, week_rank, recurrence, season=""):
+        self.id = id
+        self.name = name
+        self.month = month
+        self.day = day
+        self.weekday = weekday
+        self.week_rank = week_rank
+        self.recurrence = recurrence
+        self.season = season
+
+    def __repr__(self) -> str:  # pragma: no cover - debugging aid
+        return f"<OccurrenceRule {self.id}: {self.name}>"
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return self.name
+
+
+class Task(TaskSchedule, models.Model):
     class Season(models.TextChoices):
         SPRING = "spring", "Vår"
         SUMMER = "summer", "Sommer"
@@ -49,25 +216,48 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
-        ordering = ["season", "month", "day", "name"]
+        # No default ordering: every view orders explicitly, and an implicit
+        # ORDER BY would force a sort on each scan (the admin sets its own).
+        indexes = [
+            # season_list: filter on season among live tasks, ordered by month/day/name
+            models.Index(
+                fields=("season", "month", "day", "name"),
+                condition=Q(is_deleted=False),
+                name="task_live_season_schedule",
+            ),
+            # No index for TaskQuerySet.occurring_in (its OR over recurrence kinds is
+            # planned as a scan) or the ETag aggregate (COUNT reads every row anyway):
+            # explain_queries showed neither used, and each costs on every write.
+        ]
+
+    SCHEDULE_FIELDS = ("month", "day", "weekday", "week_rank", "recurrence")
 
     def __str__(self) -> str:  # pragma: no cover - trivial
         when = self.human_when()
         return f"{self.name} ({when})" if when else self.name
 
-    # ---- Helpers for schedule kinds ----
-    def uses_exact_date(self) -> bool:
-        return bool(self.day) and (
-            self.month is not None or self.recurrence in {self.Recurrence.MONTHLY, self.Recurrence.QUARTERLY, self.Recurrence.SEMIANNUAL}
-        )
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Keep the schedule as loaded so the post-save hook can also invalidate the
+        # months the task moves out of; read from `values` to not load deferred fields
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in cls.SCHEDULE_FIELDS):
+            instance._stored_schedule = {field: loaded[field] for field in cls.SCHEDULE_FIELDS}
+        return instance
 
-    def uses_weekday_rule(self) -> bool:
-        return (
-            self.weekday is not None
-            and bool(self.week_rank)
-            and (self.month is not None or self.recurrence in {self.Recurrence.MONTHLY, self.Recurrence.QUARTERLY, self.Recurrence.SEMIANNUAL})
-        )
+    def remember_schedule(self) -> None:
+        self._stored_schedule = {field: getattr(self, field) for field in self.SCHEDULE_FIELDS}
+
+    def stored_schedule(self) -> "OccurrenceRule | None":
+        """The schedule as last loaded or saved, or None for a new or partially loaded task."""
+        stored = getattr(self, "_stored_schedule", None)
+        if stored is None:
+            return None
+        return OccurrenceRule(self.id, self.name, season=self.season, **stored)
 
     def clean(self):
         # At least one of season, exact date, or weekday rule
@@ -117,75 +307,19 @@ class Task(models.Model):
             return Task.Season.AUTUMN
         return Task.Season.WINTER
 
-    def human_when(self) -> str:
-        # Friendly representation of timing
-        if self.day:
-            if self.recurrence == self.Recurrence.MONTHLY:
-                return f"Dag {self.day} hver måned"
-            if self.recurrence == self.Recurrence.SEMIANNUAL and self.month:
-                return f"Dag {self.day} i måned {self.month} og {((self.month + 5 - 1) % 12) + 1} (halvårlig)"
-            if self.recurrence == self.Recurrence.QUARTERLY and self.month:
-                return f"Dag {self.day} i {self.month}. måned hvert kvartal"
-            if self.month:
-                return f"{self.day:02d}.{self.month:02d} ({self.get_season_display()})"
-        if self.weekday is not None and self.week_rank:
-            weekday_names = ["Mandag", "Tirsdag", "Onsdag", "Torsdag", "Fredag", "Lørdag", "Søndag"]
-            rank_labels = {"1": "Første", "2": "Andre", "3": "Tredje", "4": "Fjerde", "last": "Siste"}
-            if self.recurrence == self.Recurrence.MONTHLY:
-                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} hver måned"
-            if self.recurrence == self.Recurrence.SEMIANNUAL and self.month:
-                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} i måned {self.month} og {((self.month + 5 - 1) % 12) + 1} (halvårlig)"
-            if self.recurrence == self.Recurrence.QUARTERLY and self.month:
-                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} i måned {self.month} hvert kvartal"
-            if self.month:
-                return f"{rank_labels[self.week_rank]} {weekday_names[self.weekday]} i {calendar.month_name[self.month]}"
-        if self.season:
-            return self.get_season_display()
-        return ""
+    # ---- Materialized occurrences ----
+    def build_occurrences(self, years) -> list["TaskOccurrence"]:
+        return TaskOccurrence.build_for([self], years)
 
-    def _quarter_months(self) -> set[int]:
-        if not self.month:
-            return set()
-        base = self.month
-        return {((base - 1 + offset) % 12) + 1 for offset in (0, 3, 6, 9)}
+    def sync_occurrences(self) -> None:
+        """Rebuilds the TaskOccurrence rows for the rolling horizon around the current year."""
+        with transaction.atomic():
+            self.clear_occurrences()
+            if not self.is_deleted:
+                TaskOccurrence.objects.bulk_create(self.build_occurrences(TaskOccurrence.horizon()))
 
-    def _semiannual_months(self) -> set[int]:
-        if not self.month:
-            return set()
-        base = self.month
-        return {base, ((base - 1 + 6) % 12) + 1}
-
-    def occurs_in_month(self, year: int, month: int) -> bool:
-        if self.recurrence == self.Recurrence.MONTHLY:
-            return True
-        if self.recurrence == self.Recurrence.QUARTERLY:
-            return month in self._quarter_months()
-        if self.recurrence == self.Recurrence.SEMIANNUAL:
-            return month in self._semiannual_months()
-        # yearly
-        return self.month == month
-
-    def occurrence_day_in(self, year: int, month: int) -> int | None:
-        """
-        Returns the day-of-month (1..31) when this task occurs for the given year+month,
-        or None if it does not occur in that month. Works for both schedule types.
-        """
-        if not self.occurs_in_month(year, month):
-            return None
-        if self.day:
-            # Exact day, but if month has fewer days (e.g., 30 vs 31), skip occurrence
-            _, last_day = calendar.monthrange(year, month)
-            return self.day if self.day <= last_day else None
-        if self.weekday is not None and self.week_rank:
-            cal = calendar.Calendar(firstweekday=0)
-            days = [d for d, wd in cal.itermonthdays2(year, month) if d != 0 and wd == self.weekday]
-            if not days:
-                return None
-            if self.week_rank == Task.WeekRank.LAST:
-                return days[-1]
-            idx = int(self.week_rank) - 1
-            return days[idx] if idx < len(days) else None
-        return None
+    def clear_occurrences(self) -> None:
+        TaskOccurrence.objects.filter(task=self).delete()
 
 
 class TaskDone(models.Model):
@@ -193,12 +327,139 @@ class TaskDone(models.Model):
     year = models.PositiveIntegerField()
     # Per-month completion for recurring schedules
     month = models.PositiveSmallIntegerField(null=True, blank=True)
-    completed_at = models.DateTimeField(auto_now_add=True)
+    # Not auto_now_add, so imported history keeps its original timestamps
+    completed_at = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         constraints = [
             models.UniqueConstraint(fields=("task", "year", "month"), name="unique_task_year_month_done"),
         ]
+        indexes = [
+            # Per-period lookups lead with year/month (the unique constraint leads with task);
+            # completed_at makes the conditional GET aggregate index-only
+            models.Index(fields=("year", "month", "completed_at"), name="taskdone_period_completed"),
+            # Admin date hierarchy and its newest-first ordering
+            models.Index(fields=("completed_at",), name="taskdone_completed_at"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"{self.task.name} done in {self.year}-{self.month or 0}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Period as loaded, so the post-save hook also refreshes the one an edited mark left
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in ("task_id", "year", "month")):
+            instance._stored_period = (loaded["task_id"], loaded["year"], loaded["month"])
+        return instance
+
+    def periods(self) -> set[tuple[int, int, int | None]]:
+        """(task_id, year, month) of the mark, plus the stored one if the mark was moved."""
+        periods = {(self.task_id, self.year, self.month)}
+        stored = getattr(self, "_stored_period", None)
+        if stored is not None:
+            periods.add(stored)
+        return periods
+
+    def remember_period(self) -> None:
+        self._stored_period = (self.task_id, self.year, self.month)
+
+
+class TaskOccurrence(models.Model):
+    """
+    Precomputed day of a task in a given month, kept for HORIZON_YEARS around the
+    current year so the calendar views can read a month with one indexed query.
+    Rebuilt per task whenever it is saved (see yearwheel.signals) and in bulk by
+    the `sync_occurrences` management command (run on startup to roll the window).
+    """
+
+    HORIZON_YEARS = 3
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="occurrences")
+    year = models.PositiveIntegerField()
+    month = models.PositiveSmallIntegerField()
+    day = models.PositiveSmallIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("task", "year", "month"), name="unique_task_occurrence_month"),
+        ]
+        indexes = [
+            models.Index(fields=("year", "month", "day"), name="occurrence_year_month_day"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - trivial
-        return f"{self.task.name} done in {self.year}-{self.month or 0}"
\ No newline at end of file
+        return f"{self.task.name} on {self.year}-{self.month:02d}-{self.day:02d}"
+
+    @classmethod
+    def build_for(cls, tasks, years) -> list["TaskOccurrence"]:
+        """Unsaved occurrence rows for all `tasks` over `years`, resolved in one batch per year."""
+        from .occurrences import year_occurrences
+
+        return [
+            cls(task_id=task_id, year=year, month=month, day=day)
+            for year in years
+            for task_id, month, day in year_occurrences(tasks, year)
+        ]
+
+    @classmethod
+    def insert_for(cls, tasks, years) -> int:
+        """
+        Inserts the occurrence rows of `tasks` over `years` with a single executemany,
+        skipping model instances; for bulk loads where build_for + bulk_create
+        spends most of its time constructing objects. Returns the row count.
+        """
+        from .occurrences import year_occurrences
+
+        rows = [(task_id, year, month, day) for year in years for task_id, month, day in year_occurrences(tasks, year)]
+        if rows:
+            qn = connection.ops.quote_name
+            columns = ", ".join(qn(cls._meta.get_field(name).column) for name in ("task", "year", "month", "day"))
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO {qn(cls._meta.db_table)} ({columns}) VALUES (%s, %s, %s, %s)", rows
+                )
+        return len(rows)
+
+    @classmethod
+    def horizon(cls) -> range:
+        year = timezone.localdate().year
+        return range(year - cls.HORIZON_YEARS, year + cls.HORIZON_YEARS + 1)
+
+    @classmethod
+    def covers(cls, year: int) -> bool:
+        # Serve one year less than we materialize so a process that outlives a new year
+        # (before the next sync) never reads a half-filled edge year.
+        return abs(year - timezone.localdate().year) < cls.HORIZON_YEARS
+
+
+class TaskYearStats(models.Model):
+    """
+    Completion summary of one task in one year, kept in step with TaskDone and the
+    task's schedule by yearwheel.stats so the stats page reads a row per task
+    instead of every mark and occurrence. Bit m-1 of the month masks is month m.
+    """
+
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name="year_stats")
+    year = models.PositiveIntegerField()
+    expected_months = models.PositiveIntegerField(default=0)
+    done_months = models.PositiveIntegerField(default=0)
+    expected_count = models.PositiveSmallIntegerField(default=0)
+    # Done marks that fall on an expected month
+    done_count = models.PositiveSmallIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=("task", "year"), name="unique_task_year_stats"),
+        ]
+        indexes = [
+            models.Index(fields=("year",), name="taskyearstats_year"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - trivial
+        return f"{self.task.name} in {self.year}: {self.done_count}/{self.expected_count}"
+
+    def recount(self) -> None:
+        self.expected_count = self.expected_months.bit_count()
+        self.done_count = (self.expected_months & self.done_months).bit_count()
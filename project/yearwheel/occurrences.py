@@ -0,0 +1,126 @@
+"""
+Batched occurrence resolution.
+
+Resolves every (task_id, month, day) occurrence of many tasks for a whole year in
+one vectorized pass over the schedule columns, instead of calling
+Task.occurrence_day_in once per task and month. The rules mirror the model
+methods exactly: an exact day wins over a weekday rule, and days that do not
+exist in a month (31 in June, a fifth Monday) yield no occurrence.
+
+`agenda` is the lazy counterpart for date-ordered reads: it merges per-task
+date iterators, so a consumer that stops early never resolves later months.
+"""
+import heapq
+from functools import lru_cache
+
+import numpy as np
+
+from .geometry import month_geometry
+from .models import Task
+
+MONTHS = np.arange(1, 13)
+
+_RECURRENCE_CODES = {
+    Task.Recurrence.YEARLY: 0,
+    Task.Recurrence.SEMIANNUAL: 1,
+    Task.Recurrence.QUARTERLY: 2,
+    Task.Recurrence.MONTHLY: 3,
+}
+# week_rank as an integer; -1 marks "last", 0 means no weekday rule
+_RANK_CODES = {"": 0, "1": 1, "2": 2, "3": 3, "4": 4, Task.WeekRank.LAST: -1}
+
+
+@lru_cache(maxsize=64)
+def year_geometry(year: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (last_day, first_weekday_day) for the year: the length of each month
+    (shape 12) and the day-of-month of the first Monday..Sunday in each month
+    (shape 12x7), built from the shared month geometry cache.
+    """
+    months = [month_geometry(year, m) for m in MONTHS.tolist()]
+    last_day = np.array([g.last_day for g in months])
+    first_day = np.array([[days[0] for days in g.weekday_days] for g in months])
+    return last_day, first_day
+
+
+def schedule_arrays(tasks) -> dict[str, np.ndarray]:
+    """Packs the schedule columns of `tasks` into parallel integer arrays (0/-1 for blanks)."""
+    rows = [
+        (
+            t.id,
+            t.month or 0,
+            t.day or 0,
+            -1 if t.weekday is None else t.weekday,
+            _RANK_CODES.get(t.week_rank, 0),
+            _RECURRENCE_CODES.get(t.recurrence, 0),
+        )
+        for t in tasks
+    ]
+    columns = np.array(rows, dtype=np.int64).reshape(-1, 6).T
+    return dict(zip(("id", "month", "day", "weekday", "rank", "recurrence"), columns))
+
+
+def day_matrix(tasks, year: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns (ids, days) where days has shape (len(tasks), 12) and holds the
+    occurrence day per task and month, or 0 when the task does not occur.
+    """
+    cols = schedule_arrays(tasks)
+    last_day, first_day = year_geometry(year)
+    month, rec = cols["month"][:, None], cols["recurrence"][:, None]
+
+    # Anchor-month rules (Task.occurs_in_month)
+    offset = (MONTHS[None, :] - month) % 12
+    occurs = np.select(
+        [rec == 3, rec == 2, rec == 1],
+        [True, (month > 0) & (offset % 3 == 0), (month > 0) & (offset % 6 == 0)],
+        default=month == MONTHS[None, :],
+    )
+
+    # Exact day, dropped when the month is too short
+    day = cols["day"][:, None]
+    exact = np.where(day <= last_day[None, :], day, 0)
+
+    # Ordinal weekday: first matching day, then step whole weeks
+    weekday, rank = cols["weekday"], cols["rank"][:, None]
+    has_rule = (weekday >= 0)[:, None] & (rank != 0)
+    first = first_day[:, np.clip(weekday, 0, 6)].T
+    nth = np.where(rank > 0, first + 7 * (rank - 1), first + 7 * ((last_day[None, :] - first) // 7))
+    ordinal = np.where(has_rule & (nth <= last_day[None, :]), nth, 0)
+
+    days = np.where(day > 0, exact, ordinal)
+    return cols["id"], np.where(occurs, days, 0)
+
+
+def year_occurrences(tasks, year: int) -> list[tuple[int, int, int]]:
+    """Returns every (task_id, month, day) occurrence of `tasks` in `year`, in task then month order."""
+    tasks = list(tasks)
+    if not tasks:
+        return []
+    ids, days = day_matrix(tasks, year)
+    rows, cols = np.nonzero(days)
+    return list(zip(ids[rows].tolist(), (cols + 1).tolist(), days[rows, cols].tolist()))
+
+
+def month_masks(tasks, year: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns (ids, masks) where bit m-1 of a task's mask is set when it occurs in month m of `year`."""
+    tasks = list(tasks)
+    if not tasks:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    ids, days = day_matrix(tasks, year)
+    return ids, ((days > 0) << (MONTHS - 1)[None, :]).sum(axis=1)
+
+
+def agenda(rules, start, end):
+    """
+    Lazily yields (date, rule) for every occurrence of `rules` between `start` and
+    `end` (inclusive) in date order, ties by name, across month and year boundaries.
+    """
+    for when, _, _, rule in heapq.merge(*(_dated(rule, start, end) for rule in rules)):
+        yield when, rule
+
+
+def _dated(rule, start, end):
+    name = rule.name.lower()
+    for when in rule.occurrence_dates(start, end):
+        yield when, name, rule.id, rule
@@ -0,0 +1,98 @@
+"""
+Full-text search over task names and notes.
+
+On SQLite the index is an FTS5 table keyed by task id, holding live tasks only.
+It is written by the app like the other derived tables: `index_tasks` runs from
+the task post-save hook (yearwheel.signals) and the bulk import, and the
+`rebuild_search_index` command refills it. On PostgreSQL a partial
+GIN index over the same tsvector expression the query uses keeps itself
+current. Queries match every word as a prefix (search as you type), rank name
+hits above notes hits and return at most MAX_RESULTS tasks.
+"""
+import re
+
+from django.db import connection
+
+from .models import OccurrenceRule, Task
+
+FTS_TABLE = "yearwheel_task_fts"
+MAX_RESULTS = 20
+MAX_TERMS = 8
+# Must match the expression of the task_search_vector index (migration 0010)
+PG_VECTOR = (
+    "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(notes, '')), 'B')"
+)
+
+
+def terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())[:MAX_TERMS]
+
+
+def index_tasks(tasks) -> None:
+    """Replaces the index entries of `tasks`; soft-deleted ones are only removed."""
+    if connection.vendor != "sqlite":
+        return
+    tasks = list(tasks)
+    drop_tasks([task.id for task in tasks])
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, notes) VALUES (%s, %s, %s)",
+            [(task.id, task.name, task.notes) for task in tasks if not task.is_deleted],
+        )
+
+
+def drop_tasks(task_ids) -> None:
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(f"DELETE FROM {FTS_TABLE} WHERE rowid = %s", [(task_id,) for task_id in task_ids])
+
+
+def rebuild_index() -> int:
+    """Refills the SQLite index from the live tasks; returns the number indexed."""
+    if connection.vendor != "sqlite":
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, notes) "
+            f"SELECT id, name, notes FROM {Task._meta.db_table} WHERE NOT is_deleted"
+        )
+        return cursor.rowcount
+
+
+def _ranked_ids(words: list[str], limit: int) -> list[int]:
+    table = Task._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            # bm25 is lower for better matches; name hits weigh ten times notes hits
+            cursor.execute(
+                f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s "
+                f"ORDER BY bm25({FTS_TABLE}, 10.0, 1.0) LIMIT %s",
+                [" ".join(f'"{word}"*' for word in words), limit],
+            )
+        elif connection.vendor == "postgresql":
+            cursor.execute(
+                f"SELECT id FROM {table}, to_tsquery('simple', %s) query "
+                f"WHERE NOT is_deleted AND ({PG_VECTOR}) @@ query "
+                f"ORDER BY ts_rank({PG_VECTOR}, query) DESC, name LIMIT %s",
+                [" & ".join(f"{word}:*" for word in words), limit],
+            )
+        else:
+            return list(
+                Task.objects.filter(is_deleted=False, name__icontains=" ".join(words))
+                .order_by("name")
+                .values_list("id", flat=True)[:limit]
+            )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search(query: str, limit: int = MAX_RESULTS) -> list[OccurrenceRule]:
+    """Live tasks matching every word of `query`, best match first."""
+    words = terms(query)
+    if not words:
+        return []
+    ids = _ranked_ids(words, limit)
+    rules = {rule.id: rule for rule in Task.objects.filter(id__in=ids, is_deleted=False).rules()}
+    return [rules[task_id] for task_id in ids if task_id in rules]
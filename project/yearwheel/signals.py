@@ -0,0 +1,76 @@
+"""
+Keeps the data derived from a task in step however the task is written: the
+views, the admin or plain `save()`/`delete()` calls. Saving (including the
+soft delete) rebuilds the task's occurrence rows, its stats rows and its search
+entry in the same transaction; once that commits, it drops the cached calendar
+months the task left or joined and tells live pages.
+
+Saving or deleting a TaskDone likewise recounts the stats rows of its year and,
+after commit, drops the cached month it is shown in.
+
+Bulk writes (`bulk_create`/`bulk_update`, queryset `update()`) send no signals;
+the import in yearwheel.transfer updates the derived tables itself, and the
+rebuild management commands cover anything else.
+"""
+from django.db import transaction
+
+from . import events, fragments, search, stats
+from .models import Task
+
+
+def task_saved(sender, instance, raw=False, **kwargs) -> None:
+    if raw:
+        # loaddata: the fixture is expected to carry the derived rows as well
+        return
+    task = instance
+    task.sync_occurrences()
+    stats.sync_task(task)
+    search.index_tasks([task])
+    stale = fragments.task_months(task)
+    previous = task.stored_schedule()
+    if previous is not None:
+        stale |= fragments.task_months(previous)
+    task.remember_schedule()
+    _after_commit(stale, task.id)
+
+
+def task_deleted(sender, instance, **kwargs) -> None:
+    # Occurrence and stats rows go with the task through the foreign key cascade
+    search.drop_tasks([instance.id])
+    _after_commit(fragments.task_months(instance), instance.id)
+
+
+def _after_commit(months, task_id: int) -> None:
+    # A render that runs before the commit would cache the old rows under the new
+    # month version, so bump it (and tell live pages) only once the write is visible
+    def notify():
+        fragments.invalidate_months(months)
+        events.publish_task(task_id)
+
+    transaction.on_commit(notify)
+
+
+def done_saved(sender, instance, raw=False, **kwargs) -> None:
+    if raw:
+        return
+    periods = instance.periods()
+    instance.remember_period()
+    stats.record_marks(periods)
+    _invalidate_done_months(periods)
+
+
+def done_deleted(sender, instance, origin=None, **kwargs) -> None:
+    if getattr(origin, "model", type(origin)) is Task:
+        # Cascade from deleting the task: its stats rows go with it, and the task's
+        # own hook drops the cached months
+        return
+    periods = instance.periods()
+    stats.record_marks(periods)
+    _invalidate_done_months(periods)
+
+
+def _invalidate_done_months(periods) -> None:
+    # Month-less marks are not shown in the calendar grid
+    months = {month for _, _, month in periods if month}
+    if months:
+        transaction.on_commit(lambda: fragments.invalidate_months(months))
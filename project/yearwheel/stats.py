@@ -0,0 +1,234 @@
+"""
+Completion statistics backed by the TaskYearStats summary table.
+
+Writers keep the rows in step incrementally: `record_marks` whenever a TaskDone
+is saved or deleted and `sync_task` whenever a task is saved (yearwheel.signals),
+`add_tasks` for bulk-created tasks; bulk TaskDone writers call `record_marks`
+themselves, and the `rebuild_stats` command recomputes the table from scratch.
+`year_report` builds the stats page from one row per task and year, so it costs
+O(tasks) rather than O(tasks x years x months).
+
+An occurrence counts as overdue once its month has ended without a done mark.
+"""
+from collections import defaultdict
+
+import numpy as np
+from django.db import transaction
+
+from .models import OccurrenceRule, Task, TaskDone, TaskOccurrence, TaskYearStats
+from .occurrences import MONTHS, month_masks
+
+ALL_MONTHS = (1 << 12) - 1
+# How many years back a current streak is followed
+STREAK_YEARS = 3
+_COUNT_FIELDS = ("expected_months", "done_months", "expected_count", "done_count")
+
+
+def month_bit(month: int) -> int:
+    return 1 << (month - 1)
+
+
+def expected_masks(tasks, years) -> dict[tuple[int, int], int]:
+    """Non-empty expected-month masks of `tasks` keyed by (task_id, year)."""
+    masks = {}
+    for year in years:
+        ids, year_masks = month_masks(tasks, year)
+        for task_id, mask in zip(ids.tolist(), year_masks.tolist()):
+            if mask:
+                masks[(task_id, year)] = mask
+    return masks
+
+
+def record_marks(periods) -> None:
+    """
+    Recounts the done months of the summary rows touched by `periods`, an iterable
+    of (task_id, year, month) keys, from the TaskDone rows. Idempotent, so callers
+    may pass periods that did not change.
+    """
+    keys = {(task_id, year) for task_id, year, _ in periods}
+    if not keys:
+        return
+    task_ids, years = {task_id for task_id, _ in keys}, {year for _, year in keys}
+    with transaction.atomic():
+        rows = {
+            (row.task_id, row.year): row
+            for row in TaskYearStats.objects.select_for_update().filter(task_id__in=task_ids, year__in=years)
+            if (row.task_id, row.year) in keys
+        }
+        done = defaultdict(int)
+        marks = TaskDone.objects.filter(task_id__in=task_ids, year__in=years, month__isnull=False)
+        for task_id, year, month in marks.values_list("task_id", "year", "month"):
+            done[(task_id, year)] |= month_bit(month)
+        missing = keys - rows.keys()
+        if missing:
+            rules = Task.objects.filter(id__in={task_id for task_id, _ in missing}).rules()
+            expected = expected_masks(rules, {year for _, year in missing})
+            for task_id, year in missing:
+                rows[(task_id, year)] = TaskYearStats(
+                    task_id=task_id, year=year, expected_months=expected.get((task_id, year), 0)
+                )
+        for key, row in rows.items():
+            row.done_months = done.get(key, 0)
+            row.recount()
+        TaskYearStats.objects.bulk_create([rows[key] for key in missing])
+        TaskYearStats.objects.bulk_update([row for key, row in rows.items() if key not in missing], _COUNT_FIELDS)
+
+
+def sync_task(task: Task) -> None:
+    """Recomputes the expected months of the task's rows after its schedule changed."""
+    with transaction.atomic():
+        rows = {row.year: row for row in TaskYearStats.objects.select_for_update().filter(task=task)}
+        years = set(rows) | set(TaskOccurrence.horizon())
+        expected = expected_masks([task], years)
+        created = []
+        for year in sorted(years):
+            mask = expected.get((task.id, year), 0)
+            row = rows.get(year)
+            if row is None:
+                if not mask:
+                    continue
+                row = TaskYearStats(task=task, year=year)
+                created.append(row)
+            row.expected_months = mask
+            row.recount()
+        TaskYearStats.objects.bulk_create(created)
+        TaskYearStats.objects.bulk_update(list(rows.values()), _COUNT_FIELDS)
+
+
+def add_tasks(tasks) -> None:
+    """Creates the summary rows of newly created tasks, which have no done marks yet."""
+    rows = []
+    for (task_id, year), mask in expected_masks(tasks, TaskOccurrence.horizon()).items():
+        row = TaskYearStats(task_id=task_id, year=year, expected_months=mask)
+        row.recount()
+        rows.append(row)
+    TaskYearStats.objects.bulk_create(rows, batch_size=5000)
+
+
+def rebuild(batch_size: int = 2000) -> int:
+    """Recomputes every summary row from the live tasks and TaskDone; returns the row count."""
+    done = defaultdict(int)
+    marks = TaskDone.objects.filter(month__isnull=False).values_list("task_id", "year", "month")
+    for task_id, year, month in marks.iterator(chunk_size=batch_size):
+        done[(task_id, year)] |= month_bit(month)
+    years = set(TaskOccurrence.horizon()) | {year for _, year in done}
+
+    def rows_for(batch):
+        expected = expected_masks(batch, years)
+        ids = {rule.id for rule in batch}
+        keys = expected.keys() | {key for key in done if key[0] in ids}
+        for task_id, year in keys:
+            row = TaskYearStats(
+                task_id=task_id,
+                year=year,
+                expected_months=expected.get((task_id, year), 0),
+                done_months=done.get((task_id, year), 0),
+            )
+            row.recount()
+            yield row
+
+    count = 0
+    rules = Task.objects.filter(is_deleted=False).values_list(*OccurrenceRule.FIELDS)
+    with transaction.atomic():
+        TaskYearStats.objects.all().delete()
+        batch = []
+        for row in rules.iterator(chunk_size=batch_size):
+            batch.append(OccurrenceRule(*row))
+            if len(batch) >= batch_size:
+                count += len(TaskYearStats.objects.bulk_create(rows_for(batch), batch_size=5000))
+                batch = []
+        count += len(TaskYearStats.objects.bulk_create(rows_for(batch), batch_size=5000))
+    return count
+
+
+def due_months(year: int, today) -> int:
+    """Mask of the months of `year` that have ended by `today`."""
+    if year < today.year:
+        return ALL_MONTHS
+    if year > today.year:
+        return 0
+    return month_bit(today.month) - 1
+
+
+def current_streak(masks: dict[int, tuple[int, int]], year: int, due: int) -> int:
+    """
+    Done occurrences in a row, counted back from the last ended month of `year`.
+    `masks` maps year to (expected_months, done_months) for one task.
+    """
+    streak = 0
+    for y in range(year, year - STREAK_YEARS, -1):
+        expected, done = masks.get(y, (0, 0))
+        window = expected & (due if y == year else ALL_MONTHS)
+        for month in range(12, 0, -1):
+            if window & month_bit(month):
+                if not done & month_bit(month):
+                    return streak
+                streak += 1
+    return streak
+
+
+def _rate(done: int, expected: int) -> int:
+    return round(100 * done / expected) if expected else 0
+
+
+def year_report(year: int, today) -> dict:
+    """Year, month and per-task completion figures for the stats page."""
+    due = due_months(year, today)
+    rows = TaskYearStats.objects.filter(
+        task__is_deleted=False, year__gt=year - STREAK_YEARS, year__lte=year
+    ).values_list("task_id", "task__name", "year", "expected_months", "done_months", "expected_count", "done_count")
+
+    names, masks, counts = {}, defaultdict(dict), {}
+    for task_id, name, row_year, expected, done, expected_count, done_count in rows:
+        masks[task_id][row_year] = (expected, done)
+        if row_year == year and expected:
+            names[task_id] = name
+            counts[task_id] = (expected_count, done_count)
+
+    tasks = []
+    for task_id, name in names.items():
+        expected, done = masks[task_id][year]
+        expected_count, done_count = counts[task_id]
+        tasks.append(
+            {
+                "id": task_id,
+                "name": name,
+                "expected": expected_count,
+                "done": done_count,
+                "percent": _rate(done_count, expected_count),
+                "overdue": (expected & ~done & due).bit_count(),
+                "streak": current_streak(masks[task_id], year, due),
+            }
+        )
+    tasks.sort(key=lambda t: (-t["overdue"], t["name"].lower()))
+
+    # Month columns: one bit per month and task, summed over tasks
+    expected = np.array([masks[t["id"]][year][0] for t in tasks], dtype=np.int64)
+    done = np.array([masks[t["id"]][year][1] for t in tasks], dtype=np.int64) & expected
+    shifts = (MONTHS - 1)[None, :]
+    expected_per_month = ((expected[:, None] >> shifts) & 1).sum(axis=0).tolist()
+    done_per_month = ((done[:, None] >> shifts) & 1).sum(axis=0).tolist()
+    months = []
+    for month, (expected_n, done_n) in enumerate(zip(expected_per_month, done_per_month), start=1):
+        is_due = bool(due & month_bit(month))
+        months.append(
+            {
+                "month": month,
+                "expected": expected_n,
+                "done": done_n,
+                "percent": _rate(done_n, expected_n),
+                "overdue": expected_n - done_n if is_due else 0,
+                "due": is_due,
+            }
+        )
+
+    expected_total = sum(t["expected"] for t in tasks)
+    done_total = sum(t["done"] for t in tasks)
+    return {
+        "expected": expected_total,
+        "done": done_total,
+        "percent": _rate(done_total, expected_total),
+        "overdue": sum(t["overdue"] for t in tasks),
+        "months": months,
+        "tasks": tasks,
+    }
@@ -0,0 +1,17 @@
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's content-hashed, precompressed storage, falling back to the plain
+    name for files that were never collected, so pages still render before the
+    CSS build and collectstatic have run (local runs, tests).
+    """
+
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
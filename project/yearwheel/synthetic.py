@@ -0,0 +1,79 @@
+"""
+Deterministic synthetic task sets for benchmarks and query-plan checks.
+
+Covers every recurrence and schedule kind (exact date, ordinal weekday,
+season only) plus a share of soft-deleted rows, so measurements exercise the
+same mix of branches as a real year wheel.
+"""
+import random
+from contextlib import contextmanager
+
+from django.db import transaction
+
+from .models import Task, TaskDone, TaskOccurrence
+
+_RECURRENCES = list(Task.Recurrence.values)
+_RANKS = list(Task.WeekRank.values)
+_SEASONS = list(Task.Season.values)
+
+
+def synthetic_tasks(count: int, seed: int = 0) -> list[Task]:
+    """Returns `count` unsaved, valid tasks."""
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        kind = i % 3
+        recurrence = _RECURRENCES[(i // 3) % len(_RECURRENCES)]
+        task = Task(
+            name=f"Oppgave {i:06d}",
+            notes="x" * rng.choice((0, 0, 40, 400)),
+            recurrence=recurrence,
+            is_deleted=rng.random() < 0.05,
+        )
+        if kind == 2:
+            # Season-only tasks never show up in the month views
+            task.recurrence = Task.Recurrence.YEARLY
+            task.season = rng.choice(_SEASONS)
+        else:
+            if recurrence != Task.Recurrence.MONTHLY or rng.random() < 0.5:
+                task.month = rng.randint(1, 12)
+            if kind == 0:
+                task.day = rng.randint(1, 31)
+            else:
+                task.weekday = rng.randint(0, 6)
+                task.week_rank = rng.choice(_RANKS)
+            task.season = Task.derive_season(task.month) if task.month else ""
+        tasks.append(task)
+    return tasks
+
+
+def synthetic_done_marks(task_ids, years, ratio: float = 0.3, seed: int = 0) -> list[TaskDone]:
+    """Returns unsaved completion marks for roughly `ratio` of all task/month slots."""
+    rng = random.Random(seed)
+    return [
+        TaskDone(task_id=task_id, year=year, month=month)
+        for task_id in task_ids
+        for year in years
+        for month in range(1, 13)
+        if rng.random() < ratio
+    ]
+
+
+@contextmanager
+def rolled_back():
+    """Runs the block in a transaction that is always rolled back."""
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def load_synthetic(count: int, year: int) -> list[Task]:
+    """
+    Saves `count` synthetic tasks with completion marks and materialized
+    occurrences for `year`; returns the live (non-deleted) tasks.
+    """
+    tasks = Task.objects.bulk_create(synthetic_tasks(count), batch_size=5000)
+    live = [t for t in tasks if not t.is_deleted]
+    TaskDone.objects.bulk_create(synthetic_done_marks([t.id for t in live], [year]), batch_size=5000)
+    TaskOccurrence.objects.bulk_create(TaskOccurrence.build_for(live, [year]), batch_size=5000)
+    return live
@@ -1,3 +1,665 @@
-from django.test import TestCase
+import asyncio
+import io
+import itertools
+import os
+import runpy
+import shutil
+import tempfile
+import threading
+from datetime import date
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import call_command
+from django.db import connection, connections
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.db.utils import OperationalError
+from django.test import AsyncClient, Client, SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from . import events, fragments, search, stats, transfer
+from .geometry import month_geometry
+from .models import OccurrenceRule, Task, TaskDone, TaskOccurrence, TaskYearStats
+from .occurrences import year_occurrences
+
+SCHEDULE_COLUMNS = {"id", "name", "month", "day", "weekday", "week_rank", "recurrence", "season"}
+# Month views read tasks through the occurrence table, so task columns carry the join prefix
+OCCURRENCE_COLUMNS = {"day", "is_done"} | {f"task__{column}" for column in SCHEDULE_COLUMNS}
+
+
+class SelectedColumnsTests(TestCase):
+    """List views load only the columns they render; notes come from the details partial."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.task = Task.objects.create(
+            name="Rens takrenner", notes="Husk stigen" * 100, month=3, day=10, season=Task.Season.SPRING
+        )
+        Task.objects.create(name="Bytt dekk", month=4, day=1, season=Task.Season.SPRING)
+
+    def selected_columns(self, url: str) -> list[set[str]]:
+        """Result columns of every SELECT reading the task table while serving `url`."""
+        columns = []
+
+        def capture(execute, sql, params, many, context):
+            result = execute(sql, params, many, context)
+            if sql.lstrip().upper().startswith("SELECT") and '"yearwheel_task"' in sql:
+                columns.append({col[0] for col in context["cursor"].description})
+            return result
+
+        with connection.execute_wrapper(capture):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return columns
+
+    def test_season_list(self):
+        self.assertIn(SCHEDULE_COLUMNS | {"has_notes"}, self.selected_columns("/spring/"))
+
+    def test_month_list(self):
+        columns = self.selected_columns("/tasks/?month=3")
+        self.assertIn(OCCURRENCE_COLUMNS, columns)
+        self.assertIn({"id"}, columns)
+
+    def test_index(self):
+        year = timezone.localdate().year
+        self.assertIn(OCCURRENCE_COLUMNS, self.selected_columns(f"/?year={year}&month=3"))
+
+    def test_list_views_never_select_notes(self):
+        year = timezone.localdate().year
+        for url in ("/spring/", "/tasks/?month=3", f"/?year={year}&month=3", f"/year/{year}/", f"/stats/{year}/"):
+            with self.subTest(url=url):
+                for columns in self.selected_columns(url):
+                    self.assertNotIn("notes", columns)
+
+    def test_details_partial_loads_notes(self):
+        response = self.client.get(f"/task/{self.task.pk}/details/")
+        self.assertContains(response, "Husk stigen")
+
+
+def schedule_rules() -> list[OccurrenceRule]:
+    """One rule per combination of recurrence, anchor month and day or weekday rule, valid or not."""
+    days = [(day, None, "") for day in (None, 1, 28, 29, 30, 31)]
+    weekday_rules = [(None, weekday, rank) for weekday in range(7) for rank, _ in Task.WeekRank.choices]
+    combinations = itertools.product(Task.Recurrence.values, [None, *range(1, 13)], days + weekday_rules)
+    return [
+        OccurrenceRule(task_id, f"Regel {task_id}", month, day, weekday, week_rank, recurrence)
+        for task_id, (recurrence, month, (day, weekday, week_rank)) in enumerate(combinations, start=1)
+    ]
+
+
+class OccurrenceParityTests(TestCase):
+    """The vectorized resolver and the SQL candidate filter must agree with the per-rule model methods."""
+
+    YEARS = (2024, 2025, 2026, 2027)  # a leap year and every weekday layout of the other months
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rules = schedule_rules()
+        # bulk_create sends no post_save, so no occurrence rows are built for these
+        Task.objects.bulk_create(
+            Task(**{field: getattr(rule, field) for field in OccurrenceRule.FIELDS}) for rule in cls.rules
+        )
+
+    def test_year_occurrences_match_occurrence_day_in(self):
+        for year in self.YEARS:
+            with self.subTest(year=year):
+                expected = [
+                    (rule.id, month, day)
+                    for rule in self.rules
+                    for month in range(1, 13)
+                    if (day := rule.occurrence_day_in(year, month))
+                ]
+                self.assertEqual(year_occurrences(self.rules, year), expected)
+
+    def test_occurring_in_matches_occurs_in_month(self):
+        for year, month in itertools.product(self.YEARS, range(1, 13)):
+            with self.subTest(year=year, month=month):
+                last_day = month_geometry(year, month).last_day
+                expected = {
+                    rule.id
+                    for rule in self.rules
+                    if rule.occurs_in_month(year, month)
+                    and ((rule.day and rule.day <= last_day) or (rule.weekday is not None and rule.week_rank))
+                }
+                candidates = set(Task.objects.occurring_in(year, month).values_list("id", flat=True))
+                self.assertEqual(candidates, expected)
+                # A candidate set: never misses a task that does occur
+                self.assertTrue({rule.id for rule in self.rules if rule.occurrence_day_in(year, month)} <= candidates)
+
+
+class DerivedDataTests(TestCase):
+    """Tasks written outside TaskForm (admin, ORM) still reach every derived table."""
+
+    def setUp(self):
+        self.year = timezone.localdate().year
+        # Cached grids of earlier tests must not stand in for this test's rows
+        cache.clear()
+
+    def calendar(self, month: int) -> str:
+        return self.client.get(f"/?year={self.year}&month={month}").content.decode()
+
+    def test_orm_created_task_shows_in_month_views(self):
+        self.calendar(7)  # fills the fragment cache for July
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(name="Beis terrassen", month=7, day=14)
+        self.assertIn("Beis terrassen", self.calendar(7))
+        self.assertContains(self.client.get("/tasks/?month=7"), "Beis terrassen")
+        self.assertTrue(TaskYearStats.objects.filter(task=task, year=self.year, expected_count=1).exists())
+        self.assertEqual([rule.id for rule in search.search("terrass")], [task.id])
+
+    def test_schedule_change_moves_occurrences_and_cached_months(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(name="Beis terrassen", month=7, day=14)
+        self.calendar(7)
+        task = Task.objects.get(pk=task.pk)
+        task.month = 8
+        with self.captureOnCommitCallbacks(execute=True):
+            task.save()
+        self.assertNotIn("Beis terrassen", self.calendar(7))
+        self.assertIn("Beis terrassen", self.calendar(8))
+        self.assertEqual(set(TaskOccurrence.objects.filter(task=task).values_list("month", flat=True)), {8})
+
+    def test_cached_months_are_dropped_only_after_commit(self):
+        self.calendar(7)
+        with self.captureOnCommitCallbacks() as callbacks:
+            Task.objects.create(name="Beis terrassen", month=7, day=14)
+            # Until the commit, other requests still see (and may cache) the old rows
+            self.assertNotIn("Beis terrassen", self.calendar(7))
+        for callback in callbacks:
+            callback()
+        self.assertIn("Beis terrassen", self.calendar(7))
+
+    def test_orm_done_marks_drop_the_cached_month(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(name="Beis terrassen", month=7, day=14)
+        self.assertNotIn("line-through", self.calendar(7))
+        with self.captureOnCommitCallbacks(execute=True):
+            mark = TaskDone.objects.create(task=task, year=self.year, month=7)
+        self.assertIn("line-through", self.calendar(7))
+        with self.captureOnCommitCallbacks(execute=True):
+            mark.delete()
+        self.assertNotIn("line-through", self.calendar(7))
+
+    def test_evicted_month_version_does_not_revive_old_grids(self):
+        self.calendar(7)
+        stale_key = fragments.calendar_key(self.year, 7)
+        cache.delete("yearwheel:calendar-version:7")  # evicted or culled
+        self.assertNotEqual(fragments.calendar_key(self.year, 7), stale_key)
+        cache.delete("yearwheel:calendar-version:7")
+        fragments.invalidate_months([7])
+        self.assertNotEqual(fragments.calendar_key(self.year, 7), stale_key)
+
+    def test_soft_and_hard_delete_clear_derived_rows(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = Task.objects.create(name="Beis terrassen", month=7, day=14)
+            gone = Task.objects.create(name="Beis gjerdet", month=7, day=20)
+        self.calendar(7)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(f"/task/{kept.pk}/delete/")
+            gone.delete()
+        body = self.calendar(7)
+        self.assertNotIn("Beis terrassen", body)
+        self.assertNotIn("Beis gjerdet", body)
+        self.assertFalse(TaskOccurrence.objects.exists())
+        self.assertEqual(search.search("beis"), [])
+
+
+class StatsTests(TestCase):
+    """The summary rows kept by record_marks / sync_task equal a full stats.rebuild()."""
+
+    def summary(self) -> dict:
+        # Rows without expected or done months carry nothing; rebuild() does not write them
+        rows = TaskYearStats.objects.filter(task__is_deleted=False).exclude(expected_months=0, done_months=0)
+        return {
+            (row.task_id, row.year): (row.expected_months, row.done_months, row.expected_count, row.done_count)
+            for row in rows
+        }
+
+    def toggle(self, task: Task, year: int, month: int) -> None:
+        response = self.client.post(f"/task/{task.pk}/toggle-done/", {"year": year, "month": month})
+        self.assertEqual(response.status_code, 200)
+
+    def test_incremental_rows_match_rebuild(self):
+        year = timezone.localdate().year
+        yearly = Task.objects.create(name="Rens takrenner", month=10, day=1)
+        quarterly = Task.objects.create(name="Bytt filter", recurrence=Task.Recurrence.QUARTERLY, month=2, day=31)
+        monthly = Task.objects.create(
+            name="Test røykvarsler", recurrence=Task.Recurrence.MONTHLY, weekday=0, week_rank=Task.WeekRank.LAST
+        )
+        deleted = Task.objects.create(name="Beis terrassen", month=7, day=14)
+        for task, marked_year, month in [
+            (yearly, year, 10),
+            (yearly, year - 1, 10),
+            (yearly, year, 3),  # not an expected month
+            (quarterly, year, 5),
+            (quarterly, year, 2),  # February has no 31st
+            (monthly, year, 1),
+            (monthly, year, 2),
+            (deleted, year, 7),
+        ]:
+            self.toggle(task, marked_year, month)
+        self.toggle(monthly, year, 2)  # unmark again
+        self.client.post(
+            "/tasks/toggle-done/", {"item": [f"{monthly.pk}:{year}:3:1", f"{yearly.pk}:{year}:10:0"]}
+        )
+        # Schedule edits move the expected months under the existing done marks
+        quarterly.day = 28
+        quarterly.save()
+        yearly.month = 3
+        yearly.save()
+        self.client.post(f"/task/{deleted.pk}/delete/")
+
+        incremental = self.summary()
+        self.assertTrue(incremental)
+        stats.rebuild()
+        self.assertEqual(incremental, self.summary())
+
+    def test_orm_done_marks_update_rows(self):
+        year = timezone.localdate().year
+        task = Task.objects.create(name="Test røykvarsler", recurrence=Task.Recurrence.MONTHLY, day=1)
+        mark = TaskDone.objects.create(task=task, year=year, month=1)
+        TaskDone.objects.create(task=task, year=year, month=2)
+        self.assertEqual(TaskYearStats.objects.get(task=task, year=year).done_count, 2)
+        mark.month = 3
+        mark.save()
+        TaskDone.objects.filter(task=task, month=2).delete()
+        row = TaskYearStats.objects.get(task=task, year=year)
+        self.assertEqual((row.done_months, row.done_count), (stats.month_bit(3), 1))
+        incremental = self.summary()
+        stats.rebuild()
+        self.assertEqual(incremental, self.summary())
+
+        task.delete()
+        self.assertFalse(TaskYearStats.objects.exists())
+
+    def test_bulk_toggle_rejects_invalid_items(self):
+        task = Task.objects.create(name="Rens takrenner", month=10, day=1)
+        for item in (f"{task.pk}:-1:10:1", f"{task.pk}:10000:10:1", f"{task.pk}:2026:13:1", "x:2026:10:1"):
+            with self.subTest(item=item):
+                response = self.client.post("/tasks/toggle-done/", {"item": [f"{task.pk}:2026:10:1", item]})
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(TaskDone.objects.exists())
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        self.year = timezone.localdate().year
+        self.task = Task.objects.create(name="Rens takrenner", month=10, day=1)
+        self.url = f"/?year={self.year}&month=10"
+
+    def status_for(self, etag: str) -> int:
+        return self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_page_is_304_until_its_state_changes(self):
+        etag = self.client.get(self.url)["ETag"]
+        self.assertEqual(self.status_for(etag), 304)
+        self.client.post(f"/task/{self.task.pk}/toggle-done/", {"year": self.year, "month": 10})
+        self.assertEqual(self.status_for(etag), 200)
+
+        etag = self.client.get(self.url)["ETag"]
+        self.task.notes = "Husk stigen"
+        self.task.save()
+        self.assertEqual(self.status_for(etag), 200)
+        # The partial and the full page are separate representations
+        self.assertNotEqual(self.client.get(self.url, HTTP_HX_REQUEST="true")["ETag"], self.client.get(self.url)["ETag"])
+
+
+class FragmentResponseTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Task.objects.create(name="Rens takrenner", month=10, day=1)
+
+    def test_htmx_requests_get_the_partial(self):
+        year = timezone.localdate().year
+        for url in (f"/?year={year}&month=10", "/tasks/?month=10", "/search/?q=rens"):
+            with self.subTest(url=url):
+                page = self.client.get(url)
+                partial = self.client.get(url, HTTP_HX_REQUEST="true")
+                restore = self.client.get(url, HTTP_HX_REQUEST="true", HTTP_HX_HISTORY_RESTORE_REQUEST="true")
+                for response in (page, partial, restore):
+                    self.assertContains(response, "Rens takrenner")
+                self.assertContains(page, "<html")
+                self.assertNotContains(partial, "<html")
+                # A history restore after a cache miss replaces the whole page
+                self.assertContains(restore, "<html")
+                self.assertIn("HX-Request", page["Vary"])
+
+
+class AgendaTests(TestCase):
+    @mock.patch("django.utils.timezone.localdate", return_value=date(2026, 3, 15))
+    def test_overdue_and_upcoming_are_ordered_by_date_then_name(self, localdate):
+        monthly = Task.Recurrence.MONTHLY
+        plants = Task.objects.create(name="Vann plantene", recurrence=monthly, day=10)
+        Task.objects.create(name="Bytt filter", month=3, day=20)
+        meter = Task.objects.create(name="Avles strøm", recurrence=monthly, day=20)
+        Task.objects.create(name="Rens sluk", recurrence=monthly, day=16)
+        Task.objects.create(name="Beis terrassen", recurrence=monthly, day=17, is_deleted=True)
+        TaskDone.objects.create(task=plants, year=2026, month=2)
+        TaskDone.objects.create(task=meter, year=2026, month=3)
+
+        context = self.client.get("/agenda/").context
+        # The last 60 days (from 14 January), without the months marked done
+        self.assertEqual(
+            [(item["date"], item["task"].name) for item in context["overdue"]],
+            [
+                (date(2026, 1, 16), "Rens sluk"),
+                (date(2026, 1, 20), "Avles strøm"),
+                (date(2026, 2, 16), "Rens sluk"),
+                (date(2026, 2, 20), "Avles strøm"),
+                (date(2026, 3, 10), "Vann plantene"),
+            ],
+        )
+        self.assertEqual(
+            [(day["date"], [(item["task"].name, item["is_done"]) for item in day["items"]]) for day in context["days"]],
+            [
+                (date(2026, 3, 16), [("Rens sluk", False)]),
+                (date(2026, 3, 20), [("Avles strøm", True), ("Bytt filter", False)]),
+            ],
+        )
+
+
+def project_settings(**env) -> dict:
+    """The names project/settings.py defines when loaded with `env` added to the environment."""
+    with mock.patch.dict(os.environ, env):
+        return runpy.run_path(str(Path(settings.BASE_DIR) / "project" / "settings.py"))
+
+
+class LiveUpdateTests(SimpleTestCase):
+    @override_settings(YEARWHEEL_LIVE_UPDATES=True)
+    async def test_stream_delivers_published_events(self):
+        response = await AsyncClient().get("/events/")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        chunks = response.streaming_content
+        # The stream subscribes before its first line
+        self.assertEqual(await anext(chunks), b"retry: 5000\n\n")
+        events.publish_task(42)
+        self.assertEqual(await asyncio.wait_for(anext(chunks), 5), b"event: task\ndata: 42\n\n")
+        await chunks.aclose()
+
+    @override_settings(YEARWHEEL_LIVE_UPDATES=False)
+    async def test_disabled_stream_tells_clients_to_stop(self):
+        self.assertEqual((await AsyncClient().get("/events/")).status_code, 204)
+
+    def live_updates(self, **env) -> bool:
+        """YEARWHEEL_LIVE_UPDATES as project/settings.py computes it with live updates requested."""
+        env = {"LIVE_UPDATES": "1", "EVENTS_BACKEND": "yearwheel.events.InProcessBackend", **env}
+        return project_settings(**env)["YEARWHEEL_LIVE_UPDATES"]
+
+    def test_in_process_backend_is_off_with_several_workers(self):
+        self.assertTrue(self.live_updates(WORKERS="1"))
+        with self.assertWarnsRegex(UserWarning, "Live updates disabled"):
+            self.assertFalse(self.live_updates(WORKERS="2"))
+        self.assertTrue(self.live_updates(WORKERS="2", EVENTS_BACKEND="example.RedisBackend"))
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.gutters = Task.objects.create(name="Rens takrenner", notes="Husk stigen", month=10, day=1)
+        cls.filter_ = Task.objects.create(name="Bytt filter", recurrence=Task.Recurrence.QUARTERLY, month=1, day=15)
+        cls.alarm = Task.objects.create(name="Test røykvarsler", recurrence=Task.Recurrence.MONTHLY, day=1)
+        Task.objects.create(name="Beis terrassen", month=7, day=14, is_deleted=True)
+        TaskDone.objects.create(task=cls.filter_, year=2026, month=4)
+
+    def get_json(self, url: str, status: int = 200) -> dict:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status, response.content)
+        return response.json()
+
+    def follow_pages(self, url: str) -> list[dict]:
+        results = []
+        while url:
+            page = self.get_json(url)
+            results += page["results"]
+            url = page["next"]
+        return results
+
+    def test_cursor_pages_cover_live_tasks_once(self):
+        live = [self.gutters.id, self.filter_.id, self.alarm.id]
+        for limit in (1, 2, 3):
+            with self.subTest(limit=limit):
+                tasks = self.follow_pages(f"/api/tasks/?limit={limit}")
+                self.assertEqual([task["id"] for task in tasks], live)
+                occurrences = self.follow_pages(f"/api/occurrences/?from=2026-01&to=2026-12&limit={limit}")
+                self.assertEqual(occurrences, self.follow_pages("/api/occurrences/?from=2026-01&to=2026-12"))
+        self.assertIsNone(self.get_json("/api/tasks/?limit=3")["next"])
+
+    def test_fields_select_keys(self):
+        tasks = self.get_json("/api/tasks/?fields=name,notes")["results"]
+        self.assertEqual(tasks[0], {"name": "Rens takrenner", "notes": "Husk stigen"})
+        # Ordered by task id, then date
+        occurrences = self.get_json("/api/occurrences/?from=2026-04&to=2026-04&fields=date,done")["results"]
+        self.assertEqual(occurrences, [{"date": "2026-04-15", "done": True}, {"date": "2026-04-01", "done": False}])
+
+    def test_range_is_capped(self):
+        self.get_json("/api/occurrences/?from=2024-01&to=2026-12")
+        body = self.get_json("/api/occurrences/?from=2024-01&to=2027-01", status=400)
+        self.assertIn("36 months", body["error"])
+
+    def test_invalid_parameters_are_400(self):
+        for query in (
+            "/api/tasks/?fields=name,secret",
+            "/api/tasks/?cursor=abc",
+            "/api/occurrences/?to=2026-12",
+            "/api/occurrences/?from=2026-13&to=2026-12",
+            "/api/occurrences/?from=2026-12&to=2026-01",
+            "/api/occurrences/?from=0-01&to=0-12",
+            "/api/occurrences/?from=9999-12&to=10000-01",
+        ):
+            with self.subTest(query=query):
+                self.assertIn("error", self.get_json(query, status=400))
+
+
+class TransferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Seasons as Task.clean derives them, so imported tasks come back identical
+        gutters = Task.objects.create(
+            name="Rens takrenner", notes="Husk stigen", month=10, day=1, season=Task.Season.AUTUMN
+        )
+        filter_ = Task.objects.create(
+            name="Bytt filter", recurrence=Task.Recurrence.QUARTERLY, month=1, weekday=0, week_rank="1",
+            season=Task.Season.WINTER,
+        )
+        TaskDone.objects.create(task=gutters, year=2025, month=10)
+        TaskDone.objects.create(task=gutters, year=2024, month=None)
+        TaskDone.objects.create(task=filter_, year=2025, month=4)
+
+    def export(self, kind: str, fmt: str) -> str:
+        response = self.client.get(f"/export/{kind}.{fmt}")
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode()
+
+    def import_text(self, kind: str, fmt: str, text: str) -> transfer.ImportReport:
+        return transfer.import_stream(kind, fmt, io.StringIO(text))
+
+    def test_round_trip(self):
+        for fmt in transfer.FORMATS:
+            with self.subTest(fmt=fmt):
+                tasks, done = self.export("tasks", fmt), self.export("done", fmt)
+                Task.objects.all().delete()
+                self.assertEqual(self.import_text("tasks", fmt, tasks).created, 2)
+                self.assertEqual(self.import_text("done", fmt, done).created, 3)
+                self.assertEqual((self.export("tasks", fmt), self.export("done", fmt)), (tasks, done))
+
+    def test_reimport_changes_nothing(self):
+        for fmt in transfer.FORMATS:
+            with self.subTest(fmt=fmt):
+                report = self.import_text("done", fmt, self.export("done", fmt))
+                self.assertEqual((report.created, report.unchanged, report.errors), (0, 3, []))
+                report = self.import_text("tasks", fmt, self.export("tasks", fmt))
+                self.assertEqual((report.created, report.updated, report.unchanged), (0, 0, 2))
+        self.assertEqual(TaskDone.objects.count(), 3)
+
+    def test_empty_export(self):
+        TaskDone.objects.all().delete()
+        self.assertEqual(self.export("done", "jsonl"), "")
+        self.assertEqual(self.export("done", "csv").count("\n"), 1)
+
+    def test_wrongly_typed_fields_are_row_errors(self):
+        report = self.import_text("tasks", "jsonl", '{"name": 5, "month": 3, "day": 1}\n{"name": "Så frø", "month": 4, "day": 1}\n')
+        self.assertEqual(report.created, 1)
+        self.assertEqual(report.errors, [(1, "name: Enter a text value.")])
+
+    def test_out_of_range_years_are_row_errors(self):
+        rows = "".join(
+            f'{{"task_name": "Rens takrenner", "task_recurrence": "yearly", "task_month": 10, "task_day": 1, '
+            f'"year": {year}, "month": 10}}\n'
+            for year in (-1, 0, 10000, 2026)
+        )
+        report = self.import_text("done", "jsonl", rows)
+        self.assertEqual(report.created, 1)
+        self.assertEqual([line for line, _ in report.errors], [1, 2, 3])
+        self.assertEqual(report.errors[0], (1, "year: Year must be between 1 and 9999."))
+
+    async def test_export_streams_under_asgi(self):
+        response = await AsyncClient().get("/export/tasks.jsonl")
+        self.assertTrue(response.is_async)
+        lines = "".join([chunk.decode() async for chunk in response.streaming_content]).splitlines()
+        self.assertEqual(len(lines), 2)
+
+    async def test_ical_feed_streams_under_asgi(self):
+        response = await AsyncClient().get("/feed.ics")
+        self.assertTrue(response.is_async)
+        body = "".join([chunk.decode() async for chunk in response.streaming_content])
+        self.assertEqual(body.count("BEGIN:VEVENT"), 2)
+
+
+class StaticFilesTests(SimpleTestCase):
+    @override_settings(DEBUG=True)
+    def test_async_stack_has_no_sync_middleware(self):
+        # With DEBUG on, Django logs "Synchronous handler adapted for ..." for each one it wraps
+        with self.assertNoLogs("django.request", level="DEBUG"):
+            ASGIHandler()
+
+    def test_serves_static_root_in_both_modes(self):
+        with tempfile.TemporaryDirectory() as root, override_settings(STATIC_ROOT=Path(root)):
+            (Path(root) / "app.css").write_text("body{}")
+            responses = {
+                "wsgi": Client().get("/static/app.css"),
+                "asgi": async_to_sync(AsyncClient().get)("/static/app.css"),
+            }
+            for mode, response in responses.items():
+                with self.subTest(mode=mode):
+                    self.assertEqual(response.status_code, 200)
+                    self.assertEqual(response.getvalue(), b"body{}")
+                    self.assertTrue(response["Content-Type"].startswith("text/css"))
+
+
+class AdminSearchTests(TestCase):
+    def query_plan(self, queryset) -> str:
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            return " | ".join(row[-1] for row in cursor.fetchall())
+
+    def test_name_prefix_search_uses_index(self):
+        for queryset in (
+            Task.objects.filter(name__istartswith="rens"),
+            TaskDone.objects.filter(task__name__istartswith="rens"),
+        ):
+            with self.subTest(model=queryset.model.__name__):
+                self.assertRegex(self.query_plan(queryset), r"SEARCH yearwheel_task USING (COVERING )?INDEX task_name_prefix")
+
+
+class SQLiteProductionProfileTests(SimpleTestCase):
+    """
+    Concurrent checkbox toggles against a file database with the production
+    profile. Each worker thread swaps its own thread-local default connection
+    for one to the file, so the requests run through the real view,
+    get_or_create and stats.record_marks.
+    """
+
+    # The test database stays untouched, but the guard against queries is per backend class
+    databases = {"default"}
+    THREADS = 4
+    TOGGLES = 12
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.tmp = Path(tempfile.mkdtemp())
+        cls.addClassCleanup(shutil.rmtree, cls.tmp, ignore_errors=True)
+        cls.template = cls.tmp / "template.sqlite3"
+        cls.run_in_thread(cls.create_template)
+
+    @staticmethod
+    def run_in_thread(target, *args):
+        thread = threading.Thread(target=target, args=args)
+        thread.start()
+        thread.join()
+
+    @classmethod
+    def use_database(cls, path: Path, options: dict) -> None:
+        settings_dict = {**connections.settings["default"], "NAME": str(path), "OPTIONS": options}
+        connections["default"] = DatabaseWrapper(settings_dict, "default")
+
+    @classmethod
+    def create_template(cls):
+        cls.use_database(cls.template, {})
+        try:
+            call_command("migrate", verbosity=0)
+            cls.task_ids = [Task.objects.create(name=f"Oppgave {n}", month=1, day=1).id for n in range(cls.THREADS)]
+        finally:
+            connections["default"].close()
+
+    def toggle_concurrently(self, options: dict) -> dict[str, int]:
+        """Counts the toggles by outcome: "ok", "locked" or "failed"."""
+        path = self.tmp / "toggles.sqlite3"
+        shutil.copy(self.template, path)
+        counts = {"ok": 0, "locked": 0}
+        lock = threading.Lock()
+
+        def worker(task_id):
+            self.use_database(path, options)
+            client = Client()
+            try:
+                for n in range(self.TOGGLES):
+                    try:
+                        response = client.post(f"/task/{task_id}/toggle-done/", {"year": 2026, "month": n % 12 + 1})
+                        outcome = "ok" if response.status_code == 200 else "failed"
+                    except OperationalError:
+                        outcome = "locked"
+                    with lock:
+                        counts[outcome] = counts.get(outcome, 0) + 1
+            finally:
+                connections["default"].close()
+
+        threads = [threading.Thread(target=worker, args=(task_id,)) for task_id in self.task_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counts
+
+    def test_production_profile_toggles_without_lock_errors(self):
+        counts = self.toggle_concurrently(settings.YEARWHEEL_SQLITE_PRODUCTION_OPTIONS)
+        self.assertEqual(counts, {"ok": self.THREADS * self.TOGGLES, "locked": 0})
+
+    def test_production_profile_pragmas(self):
+        path = self.tmp / "pragmas.sqlite3"
+        wrapper = DatabaseWrapper(
+            {**connections.settings["default"], "NAME": str(path), "OPTIONS": settings.YEARWHEEL_SQLITE_PRODUCTION_OPTIONS},
+            "pragmas",
+        )
+        try:
+            with wrapper.cursor() as cursor:
+                cursor.execute("PRAGMA journal_mode")
+                self.assertEqual(cursor.fetchone()[0], "wal")
+                cursor.execute("PRAGMA synchronous")
+                self.assertEqual(cursor.fetchone()[0], 1)  # NORMAL
+                cursor.execute("PRAGMA busy_timeout")
+                self.assertEqual(cursor.fetchone()[0], 5000)
+            self.assertEqual(wrapper.transaction_mode, "IMMEDIATE")
+        finally:
+            wrapper.close()
+
+    def test_production_profile_keeps_connections_only_under_wsgi(self):
+        for asgi, max_age in (("0", 600), ("1", 0)):
+            with self.subTest(asgi=asgi):
+                databases = project_settings(SQLITE_PRODUCTION="1", ASGI=asgi, DATABASE_URL="")["DATABASES"]
+                self.assertEqual(databases["default"]["CONN_MAX_AGE"], max_age)
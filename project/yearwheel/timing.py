@@ -0,0 +1,82 @@
+"""
+Per-request timing spans reported by ServerTimingMiddleware.
+
+Code marks phases with `span(name)` and database queries are timed by a
+wrapper installed on every connection; the middleware collects the totals for the
+current request and emits them as a Server-Timing header. Outside a request
+(management commands, shell) spans are no-ops.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.template.backends.django import DjangoTemplates
+
+_current: ContextVar[dict | None] = ContextVar("yearwheel_timings", default=None)
+
+# Metric names and their Server-Timing descriptions
+OCCURRENCES = "occ"
+TEMPLATES = "tpl"
+DATABASE = "db"
+
+
+def start() -> dict:
+    timings = {}
+    _current.set(timings)
+    return timings
+
+
+def stop() -> None:
+    _current.set(None)
+
+
+def add(name: str, ms: float, count: int = 1) -> None:
+    timings = _current.get()
+    if timings is not None:
+        total, calls = timings.get(name, (0.0, 0))
+        timings[name] = (total + ms, calls + count)
+
+
+@contextmanager
+def span(name: str):
+    began = time.perf_counter()
+    try:
+        yield
+    finally:
+        add(name, (time.perf_counter() - began) * 1000)
+
+
+def time_query(execute, sql, params, many, context):
+    with span(DATABASE):
+        return execute(sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    connection_created receiver: every connection reports its queries to the
+    active request's timings. Installed per connection rather than per request
+    because async views run their queries on a worker thread's connection.
+    """
+    connection.execute_wrappers.append(time_query)
+
+
+class _TimedTemplate:
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        with span(TEMPLATES):
+            return self.template.render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Django template backend that records top-level renders under the `tpl` span."""
+
+    def from_string(self, template_code):
+        return _TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return _TimedTemplate(super().get_template(template_name))
@@ -0,0 +1,305 @@
+"""
+Bulk export and import of tasks and their completion history.
+
+Exports stream the live tasks (`tasks`) or their done marks (`done`) as CSV or
+JSON lines, reading the database with `.iterator(chunk_size=...)`. Imports read
+the same formats and write in batches. Task rows are validated with
+Task.clean_fields() and Task.clean(), then matched on their natural key (name
+plus schedule): unknown keys are bulk created, known ones get their notes and
+season updated. Done rows name their task by the same key and are bulk created,
+skipping marks that already exist. Errors are reported per row, and importing
+the same file twice changes nothing the second time.
+"""
+import csv
+import json
+from datetime import MAXYEAR, MINYEAR
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from . import fragments, search, stats
+from .models import Task, TaskDone, TaskOccurrence
+
+CHUNK_SIZE = 2000
+BATCH_SIZE = 1000
+KINDS = ("tasks", "done")
+FORMATS = ("csv", "jsonl")
+
+# Natural key of a task: two tasks with the same name and schedule are the same task
+KEY_FIELDS = ("name", "recurrence", "month", "day", "weekday", "week_rank")
+TASK_FIELDS = KEY_FIELDS + ("season", "notes")
+DONE_FIELDS = tuple(f"task_{field}" for field in KEY_FIELDS) + ("year", "month", "completed_at")
+
+
+class TransferError(Exception):
+    pass
+
+
+class ImportReport:
+    def __init__(self, kind: str):
+        self.kind = kind
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.errors: list[tuple[int, str]] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.errors.append((line, message))
+
+    def as_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "errors": [{"line": line, "message": message} for line, message in self.errors],
+        }
+
+
+def check(kind: str, fmt: str) -> None:
+    if kind not in KINDS:
+        raise TransferError(f"Unknown kind {kind!r}; expected one of {', '.join(KINDS)}")
+    if fmt not in FORMATS:
+        raise TransferError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}")
+
+
+def format_for(filename: str) -> str:
+    """Format implied by a file name (.csv, or .jsonl / .json for JSON lines)."""
+    suffix = filename.rsplit(".", 1)[-1].lower()
+    return "jsonl" if suffix == "json" else suffix
+
+
+# ---- Export ----
+
+def export_rows(kind: str):
+    if kind == "tasks":
+        rows = Task.objects.filter(is_deleted=False).order_by("id").values_list(*TASK_FIELDS)
+    else:
+        rows = (
+            TaskDone.objects.filter(task__is_deleted=False)
+            .order_by("id")
+            .values_list(*(f"task__{field}" for field in KEY_FIELDS), "year", "month", "completed_at")
+        )
+    return rows.iterator(chunk_size=CHUNK_SIZE)
+
+
+def _plain(value):
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+class _Echo:
+    # csv.writer target that hands each formatted line back instead of buffering it
+    def write(self, value):
+        return value
+
+
+def export_stream(kind: str, fmt: str):
+    """Yields the export of `kind` in `fmt` line by line."""
+    check(kind, fmt)
+    fields = TASK_FIELDS if kind == "tasks" else DONE_FIELDS
+    rows = export_rows(kind)
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(fields)
+        for row in rows:
+            yield writer.writerow([_plain(value) for value in row])
+    else:
+        for row in rows:
+            yield json.dumps(dict(zip(fields, map(_plain, row))), ensure_ascii=False) + "\n"
+
+
+# ---- Import ----
+
+def read_rows(lines, fmt: str):
+    """Yields (line number, row dict or None when the line cannot be decoded) from text `lines`."""
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield line_no, row if isinstance(row, dict) else None
+
+
+def _int(row: dict, field: str) -> int | None:
+    value = row.get(field)
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValidationError({field: "Enter a whole number."})
+
+
+def _text(row: dict, field: str) -> str:
+    value = row.get(field)
+    if value is None:
+        return ""
+    if not isinstance(value, str):
+        raise ValidationError({field: "Enter a text value."})
+    return value
+
+
+def _message(exc: ValidationError) -> str:
+    if hasattr(exc, "error_dict"):
+        return "; ".join(f"{field}: {' '.join(messages)}" for field, messages in exc.message_dict.items())
+    return " ".join(exc.messages)
+
+
+def _key(name, recurrence, month, day, weekday, week_rank) -> tuple:
+    return (name, recurrence or Task.Recurrence.YEARLY, month, day, weekday, week_rank or "")
+
+
+def _task_keys() -> dict[tuple, int]:
+    rows = Task.objects.filter(is_deleted=False).values_list("id", *KEY_FIELDS)
+    return {_key(*key): task_id for task_id, *key in rows.iterator(chunk_size=CHUNK_SIZE)}
+
+
+def _task_from_row(row: dict) -> Task:
+    task = Task(
+        name=_text(row, "name").strip(),
+        notes=_text(row, "notes"),
+        month=_int(row, "month"),
+        day=_int(row, "day"),
+        weekday=_int(row, "weekday"),
+        week_rank=_text(row, "week_rank"),
+        recurrence=_text(row, "recurrence") or Task.Recurrence.YEARLY,
+        season=_text(row, "season"),
+    )
+    task.clean_fields()
+    task.clean()
+    return task
+
+
+def import_tasks(rows, report: ImportReport) -> None:
+    keys = _task_keys()
+    seen: dict[tuple, int] = {}
+    to_create: list[Task] = []
+    to_update: dict[int, Task] = {}
+
+    def flush():
+        created = Task.objects.bulk_create(to_create)
+        TaskOccurrence.insert_for(created, TaskOccurrence.horizon())
+        stats.add_tasks(created)
+        search.index_tasks(created)
+        report.created += len(created)
+        changed = []
+        for current in Task.objects.only("id", "name", "notes", "season", "is_deleted").filter(id__in=to_update):
+            incoming = to_update[current.id]
+            if (current.notes, current.season) == (incoming.notes, incoming.season):
+                report.unchanged += 1
+                continue
+            current.notes, current.season = incoming.notes, incoming.season
+            current.updated_at = timezone.now()
+            changed.append(current)
+        Task.objects.bulk_update(changed, ["notes", "season", "updated_at"])
+        search.index_tasks(changed)
+        report.updated += len(changed)
+        to_create.clear()
+        to_update.clear()
+
+    for line, row in rows:
+        if row is None:
+            report.error(line, "Not a JSON object")
+            continue
+        try:
+            task = _task_from_row(row)
+        except ValidationError as exc:
+            report.error(line, _message(exc))
+            continue
+        key = _key(*(getattr(task, field) for field in KEY_FIELDS))
+        if key in seen:
+            report.error(line, f"Same task as line {seen[key]}")
+            continue
+        seen[key] = line
+        if key in keys:
+            to_update[keys[key]] = task
+        else:
+            to_create.append(task)
+        if len(to_create) + len(to_update) >= BATCH_SIZE:
+            flush()
+    flush()
+
+
+def _done_from_row(row: dict, keys: dict[tuple, int]) -> TaskDone:
+    key = _key(
+        _text(row, "task_name"),
+        _text(row, "task_recurrence"),
+        _int(row, "task_month"),
+        _int(row, "task_day"),
+        _int(row, "task_weekday"),
+        _text(row, "task_week_rank"),
+    )
+    if key not in keys:
+        raise ValidationError(f"No live task named {key[0]!r} with that schedule.")
+    year, month = _int(row, "year"), _int(row, "month")
+    if year is None:
+        raise ValidationError({"year": "This field is required."})
+    if not MINYEAR <= year <= MAXYEAR:
+        raise ValidationError({"year": f"Year must be between {MINYEAR} and {MAXYEAR}."})
+    if month is not None and not 1 <= month <= 12:
+        raise ValidationError({"month": "Month must be between 1 and 12."})
+    completed_at = timezone.now()
+    if row.get("completed_at"):
+        completed_at = parse_datetime(str(row["completed_at"]))
+        if completed_at is None:
+            raise ValidationError({"completed_at": "Enter a valid date/time."})
+        if timezone.is_naive(completed_at):
+            completed_at = timezone.make_aware(completed_at)
+    return TaskDone(task_id=keys[key], year=year, month=month, completed_at=completed_at)
+
+
+def import_done(rows, report: ImportReport) -> None:
+    keys = _task_keys()
+    # NULL months are distinct to the unique constraint, so month-less marks are matched here
+    yearly = set(TaskDone.objects.filter(month__isnull=True).values_list("task_id", "year"))
+    before = TaskDone.objects.count()
+    batch: list[TaskDone] = []
+    accepted = 0
+    for line, row in rows:
+        if row is None:
+            report.error(line, "Not a JSON object")
+            continue
+        try:
+            mark = _done_from_row(row, keys)
+        except ValidationError as exc:
+            report.error(line, _message(exc))
+            continue
+        accepted += 1
+        if mark.month is None:
+            if (mark.task_id, mark.year) in yearly:
+                continue
+            yearly.add((mark.task_id, mark.year))
+        batch.append(mark)
+        if len(batch) >= BATCH_SIZE:
+            # The unique (task, year, month) constraint makes re-imported marks no-ops
+            TaskDone.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    TaskDone.objects.bulk_create(batch, ignore_conflicts=True)
+    report.created = TaskDone.objects.count() - before
+    report.unchanged = accepted - report.created
+
+
+def import_stream(kind: str, fmt: str, lines) -> ImportReport:
+    """Imports `kind` rows from the text `lines` in `fmt`; valid rows are kept even when others fail."""
+    check(kind, fmt)
+    report = ImportReport(kind)
+    with transaction.atomic():
+        if kind == "tasks":
+            import_tasks(read_rows(lines, fmt), report)
+        else:
+            import_done(read_rows(lines, fmt), report)
+            if report.created:
+                # New marks can land on any task and year; recount everything
+                stats.rebuild()
+    if report.created or report.updated:
+        fragments.invalidate_months(range(1, 13))
+    return report
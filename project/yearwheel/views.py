@@ -1,18 +1,71 @@
-from django.shortcuts import render, redirect, get_object_or_404
-from django.http import HttpRequest, HttpResponse, HttpResponseNotAllowed
+from asgiref.sync import sync_to_async
+from django.shortcuts import aget_object_or_404, render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.http import HttpRequest, HttpResponse, HttpResponseBadRequest, HttpResponseNotAllowed, StreamingHttpResponse
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
 from django.utils import timezone
-from django.db.models import Q
+from django.db import transaction
+from django.db.models import BooleanField, Count, Exists, ExpressionWrapper, Max, OuterRef, Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from django.views.decorators.http import condition
+from django.views.decorators.vary import vary_on_headers
+from datetime import MAXYEAR, MINYEAR, timedelta
+from functools import wraps
+import itertools
 import calendar
-from .models import Task, TaskDone
+import hashlib
+import io
+from .models import OccurrenceRule, Task, TaskDone, TaskOccurrence
+from . import events, fragments, ical, search, stats, timing, transfer
 from .forms import TaskForm
+from .geometry import month_geometry
+from .occurrences import agenda, year_occurrences
 
 
-# Create your views here.
-def index(request: HttpRequest) -> HttpResponse:
-    # Build calendar for selected month (defaults to current) with tasks per day
-    today = timezone.localdate()
+async def _tasks_by_day(year: int, month: int) -> dict[int, list[tuple[OccurrenceRule, bool]]]:
+    """
+    Maps day-of-month to (rule, is_done) pairs for the non-deleted tasks occurring
+    that day, where is_done tells whether the task is marked done for year+month.
+    """
+    done = TaskDone.objects.filter(year=year, month=month)
+    tasks_by_day = {}
+    if TaskOccurrence.covers(year):
+        # One indexed range query over the materialized occurrences
+        rows = [
+            row
+            async for row in TaskOccurrence.objects.filter(year=year, month=month, task__is_deleted=False)
+            .annotate(is_done=Exists(done.filter(task=OuterRef("task_id"))))
+            .order_by("day", "task__name")
+            .values_list("day", "is_done", *(f"task__{field}" for field in OccurrenceRule.FIELDS))
+        ]
+        with timing.span(timing.OCCURRENCES):
+            for day, is_done, *fields in rows:
+                tasks_by_day.setdefault(day, []).append((OccurrenceRule(*fields), is_done))
+        return tasks_by_day
 
+    # Outside the horizon: resolve candidate rows in Python
+    rows = [
+        row
+        async for row in Task.objects.filter(is_deleted=False)
+        .occurring_in(year, month)
+        .annotate(is_done=Exists(done.filter(task=OuterRef("pk"))))
+        .order_by("name")
+        .values_list("is_done", *OccurrenceRule.FIELDS)
+    ]
+    with timing.span(timing.OCCURRENCES):
+        for is_done, *fields in rows:
+            rule = OccurrenceRule(*fields)
+            day = rule.occurrence_day_in(year, month)
+            if day:
+                tasks_by_day.setdefault(day, []).append((rule, is_done))
+    return tasks_by_day
+
+
+def _calendar_period(request: HttpRequest) -> tuple[int, int]:
     # Read query params year/month; fallback to today
+    today = timezone.localdate()
     try:
         year = int(request.GET.get("year") or today.year)
     except (TypeError, ValueError):
@@ -23,35 +76,130 @@ def index(request: HttpRequest) -> HttpResponse:
         month = today.month
     if not 1 <= month <= 12:
         month = today.month
+    return year, month
 
-    cal = calendar.Calendar(firstweekday=0)  # Monday first
-    raw_weeks = cal.monthdayscalendar(year, month)  # list of weeks, 0 = out-of-month
 
-    # Fetch candidate tasks (not deleted); we will resolve occurrence per month
-    candidates = Task.objects.filter(is_deleted=False)
+def _list_month(request: HttpRequest) -> int:
+    # Determine selected month from query parameter, default to current local month
+    try:
+        selected_month = int(request.GET.get("month") or 0)
+    except ValueError:
+        selected_month = 0
+    if not 1 <= selected_month <= 12:
+        selected_month = timezone.localdate().month
+    return selected_month
+
 
-    # Load completion state for the selected year+month
-    done_ids = set(
-        TaskDone.objects.filter(year=year, month=month, task__in=candidates).values_list("task_id", flat=True)
+def _etag(parts: tuple) -> str:
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _state_etag(*parts, done: dict | None = None) -> str:
+    """
+    Weak validator over the task table (latest update incl. soft deletes, row
+    count) plus, when given, the TaskDone rows matching `done`. Two aggregate
+    queries stand in for the full page build.
+    """
+    tasks = Task.objects.aggregate(updated=Max("updated_at"), count=Count("id"))
+    parts += (tasks["updated"], tasks["count"])
+    if done is not None:
+        marks = TaskDone.objects.filter(**done).aggregate(completed=Max("completed_at"), count=Count("id"))
+        parts += (marks["completed"], marks["count"])
+    return _etag(parts)
+
+
+async def _astate_etag(*parts, done: dict | None = None) -> str:
+    # Async twin of _state_etag for the async views
+    tasks = await Task.objects.aaggregate(updated=Max("updated_at"), count=Count("id"))
+    parts += (tasks["updated"], tasks["count"])
+    if done is not None:
+        marks = await TaskDone.objects.filter(**done).aaggregate(completed=Max("completed_at"), count=Count("id"))
+        parts += (marks["completed"], marks["count"])
+    return _etag(parts)
+
+
+def _async_condition(etag_func):
+    """
+    Like django.views.decorators.http.condition, for async views with an async
+    ETag function (the stock decorator calls etag_func synchronously).
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag = quote_etag(await etag_func(request, *args, **kwargs))
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                response.headers.setdefault("ETag", etag)
+            return response
+
+        return inner
+
+    return decorator
+
+
+def _wants_fragment(request: HttpRequest) -> bool:
+    # HTMX navigation swaps in a partial; history restores after a cache miss need the full page
+    return bool(request.htmx) and not request.htmx.history_restore_request
+
+
+async def _index_etag(request: HttpRequest) -> str:
+    year, month = _calendar_period(request)
+    return await _astate_etag(
+        "index", _wants_fragment(request), timezone.localdate(), year, month, done={"year": year, "month": month}
     )
 
-    tasks_by_day = {}
-    for t in candidates:
-        day = t.occurrence_day_in(year, month)
-        if not day:
-            continue
-        # transient attribute for template
-        t.is_done = t.id in done_ids
-        tasks_by_day.setdefault(day, []).append(t)
-
-    # Enrich weeks with tasks per day for easy templating
-    weeks = [
-        [
-            {"day": d, "tasks": (tasks_by_day.get(d, []) if d else [])}
-            for d in week
+
+async def _month_list_etag(request: HttpRequest) -> str:
+    year, month = timezone.localdate().year, _list_month(request)
+    return await _astate_etag(
+        "month_list", _wants_fragment(request), year, month, done={"year": year, "month": month}
+    )
+
+
+async def _season_list_etag(request: HttpRequest, season: str) -> str:
+    return await _astate_etag("season_list", season)
+
+
+# Create your views here.
+@vary_on_headers("HX-Request")
+@_async_condition(_index_etag)
+async def index(request: HttpRequest) -> HttpResponse:
+    # Build calendar for selected month (defaults to current) with tasks per day
+    today = timezone.localdate()
+    year, month = _calendar_period(request)
+
+    weekday_labels = [calendar.day_abbr[(calendar.MONDAY + i) % 7] for i in range(7)]
+
+    # The grid is served from the fragment cache until a task or completion in this month changes
+    key = await fragments.acalendar_key(year, month)
+    calendar_body = await fragments.aget_calendar(key)
+    if calendar_body is None:
+        raw_weeks = month_geometry(year, month).weeks  # list of weeks, 0 = out-of-month
+        tasks_by_day = await _tasks_by_day(year, month)
+
+        # Enrich weeks with tasks per day for easy templating
+        weeks = [
+            [
+                {"day": d, "tasks": (tasks_by_day.get(d, []) if d else [])}
+                for d in week
+            ]
+            for week in raw_weeks
         ]
-        for week in raw_weeks
-    ]
+        calendar_body = render_to_string(
+            "index.html#calendar-body",
+            {
+                "year": year,
+                "month": month,
+                "weeks": weeks,
+                "weekday_labels": weekday_labels,
+                "today_day": fragments.today_day(year, month),
+            },
+        )
+        await fragments.aset_calendar(key, calendar_body)
 
     # Compute previous and next month/year pairs
     if month == 1:
@@ -64,41 +212,41 @@ def index(request: HttpRequest) -> HttpResponse:
         next_year, next_month = year, month + 1
 
     month_label = timezone.datetime(year, month, 1).strftime("%B")
-    weekday_labels = [calendar.day_abbr[(calendar.MONDAY + i) % 7] for i in range(7)]
 
     context = {
         "today": today,
         "year": year,
         "month": month,
         "month_label": month_label,
-        "weeks": weeks,
-        "weekday_labels": weekday_labels,
+        "calendar_body": calendar_body,
         "prev_year": prev_year,
         "prev_month": prev_month,
         "next_year": next_year,
         "next_month": next_month,
     }
-    return render(request, "index.html", context)
+    template = "index.html#calendar-panel" if _wants_fragment(request) else "index.html"
+    return render(request, template, context)
 
 
-def month_list(request: HttpRequest) -> HttpResponse:
-    # Determine selected month from query parameter, default to current local month
-    try:
-        selected_month = int(request.GET.get("month") or 0)
-    except ValueError:
-        selected_month = 0
-    if not 1 <= selected_month <= 12:
-        selected_month = timezone.localdate().month
-
+@vary_on_headers("HX-Request")
+@_async_condition(_month_list_etag)
+async def month_list(request: HttpRequest) -> HttpResponse:
+    selected_month = _list_month(request)
     year = timezone.localdate().year
-    candidates = Task.objects.filter(is_deleted=False)
-    items = []
-    for t in candidates:
-        day = t.occurrence_day_in(year, selected_month)
-        if day:
-            t._occurrence_day = day
-            items.append(t)
-    tasks = sorted(items, key=lambda t: (t._occurrence_day, t.name.lower()))
+    tasks_by_day = await _tasks_by_day(year, selected_month)
+    rules = [
+        rule
+        for day, day_tasks in sorted(tasks_by_day.items())
+        for rule in sorted((rule for rule, _ in day_tasks), key=lambda rule: rule.name.lower())
+    ]
+    # Notes are loaded on demand by task_details; only flag which tasks have any
+    with_notes = {
+        task_id
+        async for task_id in Task.objects.filter(id__in=[rule.id for rule in rules])
+        .exclude(notes="")
+        .values_list("id", flat=True)
+    }
+    tasks = [{"task": rule, "has_notes": rule.id in with_notes} for rule in rules]
 
     # Build month choices 1..12
     month_choices = [
@@ -111,18 +259,244 @@ def month_list(request: HttpRequest) -> HttpResponse:
         "tasks": tasks,
         "month_choices": month_choices,
         "month_label": month_label,
+        "prev_month": 12 if selected_month == 1 else selected_month - 1,
+        "next_month": 1 if selected_month == 12 else selected_month + 1,
+    }
+    template = "month_list.html#month-list" if _wants_fragment(request) else "month_list.html"
+    return render(request, template, context)
+
+
+def _year_overview_etag(request: HttpRequest, year: int) -> str:
+    return _state_etag("year_overview", year, done={"year": year})
+
+
+@condition(etag_func=_year_overview_etag)
+def year_overview(request: HttpRequest, year: int) -> HttpResponse:
+    # Whole year in two queries: live tasks (schedule columns only) and the year's completions
+    tasks = {rule.id: rule for rule in Task.objects.filter(is_deleted=False).rules()}
+    done = set(TaskDone.objects.filter(year=year, month__isnull=False).values_list("task_id", "month"))
+
+    months = [
+        {"month": m, "label": timezone.datetime(2000, m, 1).strftime("%B"), "items": [], "done": 0}
+        for m in range(1, 13)
+    ]
+    with timing.span(timing.OCCURRENCES):
+        occurrences = year_occurrences(tasks.values(), year)
+    for task_id, month, day in occurrences:
+        is_done = (task_id, month) in done
+        entry = months[month - 1]
+        entry["items"].append({"day": day, "task": tasks[task_id], "is_done": is_done})
+        entry["done"] += is_done
+    for entry in months:
+        entry["items"].sort(key=lambda item: (item["day"], item["task"].name.lower()))
+        total = len(entry["items"])
+        entry["total"] = total
+        entry["percent"] = round(100 * entry["done"] / total) if total else 0
+
+    context = {
+        "year": year,
+        "months": months,
+        "prev_year": year - 1,
+        "next_year": year + 1,
     }
-    return render(request, "month_list.html", context)
+    return render(request, "year_overview.html", context)
 
 
-def season_list(request: HttpRequest, season: str) -> HttpResponse:
+def _stats_etag(request: HttpRequest, year: int) -> str:
+    years = range(year - stats.STREAK_YEARS + 1, year + 1)
+    return _state_etag("stats", timezone.localdate(), year, done={"year__in": years})
+
+
+@condition(etag_func=_stats_etag)
+def stats_page(request: HttpRequest, year: int) -> HttpResponse:
+    # Served from the TaskYearStats summary rows (see yearwheel.stats)
+    report = stats.year_report(year, timezone.localdate())
+    for entry in report["months"]:
+        entry["label"] = timezone.datetime(2000, entry["month"], 1).strftime("%B")
+    context = {
+        "year": year,
+        "report": report,
+        "prev_year": year - 1,
+        "next_year": year + 1,
+    }
+    return render(request, "stats.html", context)
+
+
+# Lines handed over per thread hop when streaming a sync iterator under ASGI
+STREAM_BATCH = 500
+
+
+def _stream_body(request: HttpRequest, lines):
+    """
+    Body for a StreamingHttpResponse of the sync iterator `lines`. Under ASGI
+    Django would buffer a sync iterator whole (sync_to_async(list)), so it gets
+    an async iterator that pulls STREAM_BATCH lines per trip to the sync thread.
+    """
+    if not isinstance(request, ASGIRequest):
+        return lines
+
+    async def batches():
+        take = sync_to_async(lambda: list(itertools.islice(lines, STREAM_BATCH)))
+        try:
+            while batch := await take():
+                yield "".join(batch)
+        finally:
+            # Release the database cursor of an abandoned download
+            if hasattr(lines, "close"):
+                await sync_to_async(lines.close)()
+
+    return batches()
+
+
+def _ical_feed_etag(request: HttpRequest) -> str:
+    return _state_etag("ical_feed")
+
+
+@condition(etag_func=_ical_feed_etag)
+def ical_feed(request: HttpRequest) -> StreamingHttpResponse:
+    tasks = (
+        Task.objects.filter(is_deleted=False)
+        .only("id", "name", "notes", "month", "day", "weekday", "week_rank", "recurrence", "created_at", "updated_at")
+        .order_by("id")
+        .iterator(chunk_size=500)
+    )
+    response = StreamingHttpResponse(
+        _stream_body(request, ical.calendar_stream(tasks)), content_type="text/calendar; charset=utf-8"
+    )
+    response["Content-Disposition"] = 'inline; filename="yearwheel.ics"'
+    return response
+
+
+@vary_on_headers("HX-Request")
+def search_view(request: HttpRequest) -> HttpResponse:
+    query = request.GET.get("q", "").strip()
+    context = {"query": query, "results": search.search(query), "limit": search.MAX_RESULTS}
+    # Typing in the search box only swaps the result list
+    template = "search.html#search-results" if _wants_fragment(request) else "search.html"
+    return render(request, template, context)
+
+
+def export_data(request: HttpRequest, kind: str, fmt: str) -> HttpResponse:
+    try:
+        # Fail on an unknown kind/format before the response starts streaming
+        transfer.check(kind, fmt)
+    except transfer.TransferError as exc:
+        return HttpResponseBadRequest(str(exc))
+    content_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    lines = transfer.export_stream(kind, fmt)
+    response = StreamingHttpResponse(_stream_body(request, lines), content_type=f"{content_type}; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="yearwheel-{kind}.{fmt}"'
+    return response
+
+
+def import_data(request: HttpRequest) -> HttpResponse:
+    report = error = None
+    if request.method == "POST":
+        upload = request.FILES.get("file")
+        kind = request.POST.get("kind", "")
+        if upload is None:
+            error = "Velg en fil."
+        else:
+            lines = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+            try:
+                report = transfer.import_stream(kind, transfer.format_for(upload.name), lines)
+            except (transfer.TransferError, UnicodeDecodeError) as exc:
+                error = str(exc)
+    context = {"kinds": transfer.KINDS, "formats": transfer.FORMATS, "report": report, "error": error}
+    return render(request, "transfer.html", context, status=400 if error else 200)
+
+
+AGENDA_DAYS = 14
+AGENDA_MAX_DAYS = 366
+AGENDA_OVERDUE_DAYS = 60
+AGENDA_LIMIT = 100
+
+
+def _agenda_days(request: HttpRequest) -> int:
+    try:
+        days = int(request.GET.get("days") or AGENDA_DAYS)
+    except ValueError:
+        days = AGENDA_DAYS
+    return min(max(days, 1), AGENDA_MAX_DAYS)
+
+
+def _agenda_window(request: HttpRequest):
+    today = timezone.localdate()
+    return today - timedelta(days=AGENDA_OVERDUE_DAYS), today, today + timedelta(days=_agenda_days(request) - 1)
+
+
+async def _agenda_etag(request: HttpRequest) -> str:
+    since, today, until = _agenda_window(request)
+    return await _astate_etag(
+        "agenda", today, until, done={"year__gte": since.year, "year__lte": until.year}
+    )
+
+
+@_async_condition(_agenda_etag)
+async def agenda_view(request: HttpRequest) -> HttpResponse:
+    """
+    Undone occurrences of the last AGENDA_OVERDUE_DAYS days and everything due in
+    the next `days` days. The occurrence generator is consumed only until each
+    list holds AGENDA_LIMIT entries.
+    """
+    since, today, until = _agenda_window(request)
+    rules = [
+        OccurrenceRule(*row)
+        async for row in Task.objects.filter(is_deleted=False)
+        .filter(Q(day__isnull=False) | (Q(weekday__isnull=False) & ~Q(week_rank="")))
+        .values_list(*OccurrenceRule.FIELDS)
+    ]
+    done = {
+        mark
+        async for mark in TaskDone.objects.filter(
+            year__gte=since.year, year__lte=until.year, month__isnull=False
+        ).values_list("task_id", "year", "month")
+    }
+
+    def entry(when, rule):
+        return {"date": when, "task": rule, "is_done": (rule.id, when.year, when.month) in done}
+
+    with timing.span(timing.OCCURRENCES):
+        overdue = itertools.islice(
+            (e for e in itertools.starmap(entry, agenda(rules, since, today - timedelta(days=1))) if not e["is_done"]),
+            AGENDA_LIMIT + 1,
+        )
+        overdue = list(overdue)
+        upcoming = list(itertools.islice(itertools.starmap(entry, agenda(rules, today, until)), AGENDA_LIMIT + 1))
+
+    days = []
+    for item in upcoming[:AGENDA_LIMIT]:
+        if not days or days[-1]["date"] != item["date"]:
+            days.append({"date": item["date"], "items": []})
+        days[-1]["items"].append(item)
+    context = {
+        "today": today,
+        "days_ahead": _agenda_days(request),
+        "overdue_days": AGENDA_OVERDUE_DAYS,
+        "overdue": overdue[:AGENDA_LIMIT],
+        "overdue_truncated": len(overdue) > AGENDA_LIMIT,
+        "days": days,
+        "upcoming_truncated": len(upcoming) > AGENDA_LIMIT,
+        "day_choices": (7, 14, 30, 90),
+    }
+    return render(request, "agenda.html", context)
+
+
+@_async_condition(_season_list_etag)
+async def season_list(request: HttpRequest, season: str) -> HttpResponse:
     # Validate the season key against choices
     season_keys = {choice[0] for choice in Task.Season.choices}
     if season not in season_keys:
         from django.http import HttpResponseNotFound
         return HttpResponseNotFound("Season not found")
 
-    tasks = Task.objects.filter(season=season, is_deleted=False).order_by("month", "day", "name")
+    tasks = [
+        {"task": OccurrenceRule(*fields), "has_notes": has_notes}
+        async for *fields, has_notes in Task.objects.filter(season=season, is_deleted=False)
+        .annotate(has_notes=ExpressionWrapper(~Q(notes=""), output_field=BooleanField()))
+        .order_by("month", "day", "name")
+        .values_list(*OccurrenceRule.FIELDS, "has_notes")
+    ]
     context = {
         "season": season,
         "season_label": dict(Task.Season.choices)[season],
@@ -131,6 +505,12 @@ def season_list(request: HttpRequest, season: str) -> HttpResponse:
     return render(request, "season_list.html", context)
 
 
+async def task_details(request: HttpRequest, pk: int) -> HttpResponse:
+    """HTMX partial with the task's notes, loaded when a list row is expanded."""
+    task = await aget_object_or_404(Task.objects.only("id", "notes"), pk=pk, is_deleted=False)
+    return render(request, "partials/task_details.html", {"task": task})
+
+
 def task_create(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         form = TaskForm(request.POST)
@@ -182,6 +562,7 @@ def task_delete(request: HttpRequest, pk: int) -> HttpResponse:
         selected_month = task.month or 0
     task.is_deleted = True
     task.deleted_at = timezone.now()
+    # The post-save hook drops its occurrences, search entry and cached months
     task.save(update_fields=["is_deleted", "deleted_at", "updated_at"])
     if selected_month:
         return redirect(f"/tasks/?month={selected_month}")
@@ -191,10 +572,21 @@ def task_delete(request: HttpRequest, pk: int) -> HttpResponse:
     return redirect("index")
 
 
-def task_toggle_done(request: HttpRequest, task_id: int) -> HttpResponse:
+def _toggle_mark(task: Task, year: int, month: int) -> bool:
+    """Marks the task done for year+month, or unmarks it if it was; returns the new state."""
+    # One transaction, so the stats rows the TaskDone hooks recount never miss a mark
+    with transaction.atomic():
+        mark, created = TaskDone.objects.get_or_create(task=task, year=year, month=month)
+        if not created:
+            # already exists -> uncheck by deleting
+            mark.delete()
+    return created
+
+
+async def task_toggle_done(request: HttpRequest, task_id: int) -> HttpResponse:
     if request.method != "POST":
         return HttpResponseNotAllowed(["POST"])
-    task = get_object_or_404(Task, id=task_id)
+    task = await aget_object_or_404(Task.objects.only("id", "name"), id=task_id)
     try:
         year = int(request.POST.get("year") or timezone.localdate().year)
     except (TypeError, ValueError):
@@ -204,14 +596,84 @@ def task_toggle_done(request: HttpRequest, task_id: int) -> HttpResponse:
     except (TypeError, ValueError):
         month = timezone.localdate().month
 
-    mark, created = TaskDone.objects.get_or_create(task=task, year=year, month=month)
-    if not created:
-        # already exists -> uncheck by deleting
-        mark.delete()
-        is_done = False
-    else:
-        is_done = True
+    is_done = await sync_to_async(_toggle_mark)(task, year, month)
+
+    events.publish_done(task, year, month, is_done)
+    return render(
+        request, "partials/task_checkbox.html", {"task": task, "year": year, "month": month, "is_done": is_done}
+    )
+
+
+def task_bulk_toggle_done(request: HttpRequest) -> HttpResponse:
+    """
+    Applies many done/undone marks in one transaction. Expects repeated `item`
+    values of the form "<task_id>:<year>:<month>:<1|0>" and answers with the
+    updated checkboxes as HTMX out-of-band swaps.
+    """
+    if request.method != "POST":
+        return HttpResponseNotAllowed(["POST"])
+    desired = {}
+    for raw in request.POST.getlist("item"):
+        try:
+            task_id, year, month, done = (int(part) for part in raw.split(":"))
+        except ValueError:
+            return HttpResponseBadRequest(f"Invalid item: {raw!r}")
+        if not MINYEAR <= year <= MAXYEAR:
+            return HttpResponseBadRequest(f"Invalid year in item: {raw!r}")
+        if not 1 <= month <= 12:
+            return HttpResponseBadRequest(f"Invalid month in item: {raw!r}")
+        # Last entry wins for repeated (task, year, month) keys
+        desired[(task_id, year, month)] = bool(done)
+
+    tasks = Task.objects.only("id", "name").in_bulk({task_id for task_id, _, _ in desired})
+    desired = {key: done for key, done in desired.items() if key[0] in tasks}
+    marked = [key for key, done in desired.items() if done]
+    undone = Q(pk__in=[])
+    for (task_id, year, month), done in desired.items():
+        if not done:
+            undone |= Q(task_id=task_id, year=year, month=month)
+    with transaction.atomic():
+        TaskDone.objects.bulk_create(
+            [TaskDone(task_id=task_id, year=year, month=month) for task_id, year, month in marked],
+            ignore_conflicts=True,
+        )
+        # The deletes go through the TaskDone hooks; bulk_create sends no signals
+        TaskDone.objects.filter(undone).delete()
+        stats.record_marks(marked)
+    fragments.invalidate_months({month for _, _, month in marked})
+
+    parts = []
+    for (task_id, year, month), done in desired.items():
+        task = tasks[task_id]
+        events.publish_done(task, year, month, done)
+        parts.append(
+            render_to_string(
+                "partials/task_checkbox.html",
+                {"task": task, "year": year, "month": month, "is_done": done, "oob": True},
+                request,
+            )
+        )
+    return HttpResponse("".join(parts))
+
+
+async def events_stream(request: HttpRequest) -> HttpResponse:
+    """Server-sent events with checkbox fragments and task changes for open pages."""
+    if not settings.YEARWHEEL_LIVE_UPDATES:
+        # 204 tells EventSource clients to stop reconnecting
+        return HttpResponse(status=204)
+
+    async def stream():
+        subscription = events.get_backend().subscribe()
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                message = await subscription.next(timeout=15)
+                # A comment line keeps proxies from closing an idle stream
+                yield events.format_event(*message) if message else ": ping\n\n"
+        finally:
+            subscription.close()
 
-    # attach transient flag for rendering
-    task.is_done = is_done
-    return render(request, "partials/task_checkbox.html", {"task": task, "year": year, "month": month})
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response